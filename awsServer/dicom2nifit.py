@@ -1,21 +1,59 @@
 #!/usr/bin/env python3
-import argparse, os, sys
-import numpy as np
+import argparse, json, os, sys
+from concurrent.futures import ThreadPoolExecutor
 import SimpleITK as sitk
 
+SERIES_INDEX = os.path.expanduser("~/.cache/3dhpb/series_index.json")
+
+def _dir_fingerprint(dicom_dir: str) -> list:
+    """Cheap change detector: directory mtime + entry count."""
+    return [os.stat(dicom_dir).st_mtime_ns, len(os.listdir(dicom_dir))]
+
+def _load_series_index() -> dict:
+    try:
+        with open(SERIES_INDEX) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return index if isinstance(index, dict) else {}
+
+def _store_series_index(index: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(SERIES_INDEX), exist_ok=True)
+        tmp = f"{SERIES_INDEX}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, SERIES_INDEX)
+    except OSError:
+        pass
+
 def read_dicom_series(dicom_dir: str) -> sitk.Image:
     """Read a DICOM series with proper slice ordering and HU scaling."""
     reader = sitk.ImageSeriesReader()
-    series_uids = reader.GetGDCMSeriesIDs(dicom_dir)
-    if not series_uids:
-        raise RuntimeError(f"No DICOM series found in: {dicom_dir}")
+    key = os.path.abspath(dicom_dir)
+    fingerprint = _dir_fingerprint(key)
+    index = _load_series_index()
+    cached = index.get(key)
+    # File names are stored absolute, so a hit is valid from any cwd; a hit
+    # whose files have gone (e.g. edited in place within the mtime tick) is rescanned.
+    if cached and cached[0] == fingerprint and all(os.path.isfile(f) for f in cached[1]):
+        best_files = list(cached[1])
+    else:
+        series_uids = reader.GetGDCMSeriesIDs(key)
+        if not series_uids:
+            raise RuntimeError(f"No DICOM series found in: {dicom_dir}")
 
-    # Heuristic: pick the series with most files (typical axial series)
-    best_uid, best_files = None, []
-    for uid in series_uids:
-        files = reader.GetGDCMSeriesFileNames(dicom_dir, uid)
-        if len(files) > len(best_files):
-            best_uid, best_files = uid, files
+        # Heuristic: pick the series with most files (typical axial series).
+        # Per-series file listing is I/O bound, so fan it out over threads.
+        def list_files(uid):
+            return sitk.ImageSeriesReader.GetGDCMSeriesFileNames(key, uid)
+
+        with ThreadPoolExecutor(max_workers=min(8, len(series_uids))) as ex:
+            listed = list(ex.map(list_files, series_uids))
+        best_files = [os.path.abspath(f) for f in max(listed, key=len)]
+
+        index[key] = [fingerprint, best_files]
+        _store_series_index(index)
 
     reader.SetFileNames(best_files)
     # Enable rescale to HU using DICOM tags (RescaleSlope/Intercept)
@@ -24,15 +62,16 @@ def read_dicom_series(dicom_dir: str) -> sitk.Image:
     img = reader.Execute()
     return img
 
-def save_nifti(img: sitk.Image, out_path: str, hu_clip: tuple|None):
-    arr = sitk.GetArrayFromImage(img).astype(np.float32)  # z,y,x
+def save_nifti(img: sitk.Image, out_path: str, hu_clip: tuple|None, compression_level: int = 1):
+    # Cast + clip in a single multithreaded ITK pass; no NumPy round trip, one output buffer
     if hu_clip is not None:
         lo, hi = hu_clip
-        arr = np.clip(arr, lo, hi, out=arr)
-
-    out_img = sitk.GetImageFromArray(arr)
-    out_img.CopyInformation(img)  # keep spacing/origin/direction
-    sitk.WriteImage(out_img, out_path, useCompression=True)
+        out_img = sitk.Clamp(img, sitk.sitkFloat32, float(lo), float(hi))
+    else:
+        out_img = sitk.Cast(img, sitk.sitkFloat32)
+    # Spacing/origin/direction carry over from img. Level 1 gzip is several times
+    # faster than the default at a ~10% size cost.
+    sitk.WriteImage(out_img, out_path, useCompression=True, compressionLevel=compression_level)
 
 def main():
     p = argparse.ArgumentParser(description="Convert DICOM series to NIfTI (.nii.gz) in HU.")
@@ -41,6 +80,8 @@ def main():
     p.add_argument("--hu_clip", type=int, nargs=2, metavar=("LO","HI"),
                    default=(-1000, 1000),
                    help="Optional HU clipping range, default -1000 1000")
+    p.add_argument("--compression_level", type=int, default=1,
+                   help="gzip level for the .nii.gz output (1 fastest, 9 smallest), default 1")
     args = p.parse_args()
 
     if not os.path.isdir(args.dicom_dir):
@@ -48,7 +89,8 @@ def main():
 
     img = read_dicom_series(args.dicom_dir)
     os.makedirs(os.path.dirname(os.path.abspath(args.out_nii)), exist_ok=True)
-    save_nifti(img, args.out_nii, tuple(args.hu_clip) if args.hu_clip else None)
+    save_nifti(img, args.out_nii, tuple(args.hu_clip) if args.hu_clip else None,
+               compression_level=args.compression_level)
     print(f"✔ Wrote {args.out_nii}")
 
 if __name__ == "__main__":
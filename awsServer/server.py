@@ -1,24 +1,144 @@
 from fastapi import FastAPI, UploadFile, File, BackgroundTasks
 from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
-import os, subprocess, shlex, uuid, json, time, shutil
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
+from starlette.datastructures import Headers
+import asyncio, fcntl, multiprocessing, os, subprocess, shlex, uuid, json, time, shutil, threading, zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 IN_ROOT, OUT_ROOT = "/tmp/in", "/tmp/out"
+UPLOAD_CHUNK = 1 << 20
+# Leftover case dirs older than this are swept; keeps /tmp from growing without bound
+TMP_TTL_S = float(os.environ.get("HPB_TMP_TTL_S", 6 * 3600))
+SWEEP_INTERVAL_S = float(os.environ.get("HPB_SWEEP_INTERVAL_S", 15 * 60))
+SWEEP_LOCK = "/tmp/hpb_sweep.lock"
+# HPB_TS_WORKER=1: run TotalSegmentator liver in a long-lived worker process
+# (torch/CUDA init and imports paid once) instead of a fresh CLI per request
+TS_WORKER = os.environ.get("HPB_TS_WORKER") == "1"
 os.makedirs(IN_ROOT, exist_ok=True); os.makedirs(OUT_ROOT, exist_ok=True)
 
 app = FastAPI(title="HPB Segmentation API")
 
-def run(cmd: str, env=None):
+def sweep_stale_dirs(ttl_s: float = TMP_TTL_S) -> int:
+    """
+    Remove case dirs under IN_ROOT/OUT_ROOT whose mtime is older than ttl_s.
+    Guarded by a non-blocking flock so only one replica sweeps at a time.
+    """
+    removed = 0
+    with open(SWEEP_LOCK, "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return 0
+        cutoff = time.time() - ttl_s
+        for root in (IN_ROOT, OUT_ROOT):
+            with os.scandir(root) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                            shutil.rmtree(entry.path, ignore_errors=True)
+                            removed += 1
+                    except FileNotFoundError:
+                        continue
+    return removed
+
+async def sweep_loop():
+    while True:
+        try:
+            n = await asyncio.to_thread(sweep_stale_dirs)
+            if n:
+                print(f"[sweep] removed {n} stale case dirs", flush=True)
+        except Exception as e:
+            print(f"[sweep] failed: {e}", flush=True)
+        await asyncio.sleep(SWEEP_INTERVAL_S)
+
+@app.on_event("startup")
+async def start_sweeper():
+    app.state.sweeper = asyncio.create_task(sweep_loop())
+
+def cleanup_later(background_tasks: BackgroundTasks, *paths: str):
+    """Delete per-case dirs once the response has been sent."""
+    for p in paths:
+        background_tasks.add_task(shutil.rmtree, p, ignore_errors=True)
+
+class ZeroCopyFileResponse(FileResponse):
+    """
+    FileResponse that hands the fd to the server (sendfile) when it advertises
+    the ASGI "http.response.zerocopysend" extension; otherwise falls back to the
+    stock Starlette path with larger read chunks.
+    """
+    chunk_size = UPLOAD_CHUNK
+
+    async def __call__(self, scope, receive, send):
+        extensions = scope.get("extensions") or {}
+        if (
+            scope["type"] != "http"
+            or "http.response.zerocopysend" not in extensions
+            or scope["method"].upper() == "HEAD"
+            or Headers(scope=scope).get("range") is not None
+        ):
+            return await super().__call__(scope, receive, send)
+
+        if self.stat_result is None:
+            self.set_stat_headers(os.stat(self.path))
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        with open(self.path, "rb") as f:
+            await send({"type": "http.response.zerocopysend", "file": f.fileno(), "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+def run(cmd: str, env=None, tail_lines: int = 200):
     print("[cmd]", cmd, flush=True)
     env = (env or os.environ).copy()
     env.setdefault("OMP_NUM_THREADS", "1")
     env.setdefault("MKL_NUM_THREADS", "1")
-    res = subprocess.run(shlex.split(cmd), capture_output=True, text=True, env=env)
-    if res.returncode != 0:
-        # Print stdout/stderr so they hit your EC2 console logs
-        print("---- STDOUT ----\n", res.stdout, sep="", flush=True)
-        print("---- STDERR ----\n", res.stderr, sep="", flush=True)
-        raise subprocess.CalledProcessError(res.returncode, cmd, output=res.stdout, stderr=res.stderr)
-    return res
+    args = shlex.split(cmd)
+    prefix = f"[{os.path.basename(args[0])}]"
+    # Stream output live to the EC2 console; keep only the tail for error replies
+    tail = deque(maxlen=tail_lines)
+    with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, env=env) as proc:
+        for line in proc.stdout:
+            print(prefix, line, end="", flush=True)
+            tail.append(line)
+    output = "".join(tail)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=output)
+    return subprocess.CompletedProcess(args, proc.returncode, stdout=output)
+
+def _copy_upload(src, path: str) -> str:
+    src.seek(0)
+    with open(path, "wb") as f:
+        shutil.copyfileobj(src, f, UPLOAD_CHUNK)
+    return path
+
+async def save_upload(upload: UploadFile, path: str) -> str:
+    """
+    Stream an upload to disk in UPLOAD_CHUNK pieces instead of reading it whole into RAM.
+    The copy runs in a worker thread so disk writes never block the event loop.
+    """
+    return await asyncio.to_thread(_copy_upload, upload.file, path)
+
+def link_or_copy(src: str, dst: str) -> str:
+    """
+    Hardlink src to dst (same filesystem), falling back to a copy.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+async def timed(fn, *args, **kwargs):
+    """
+    Run a blocking step in a worker thread; returns (result, seconds).
+    """
+    t = time.time()
+    result = await asyncio.to_thread(fn, *args, **kwargs)
+    return result, round(time.time() - t, 2)
 
 def nnunet_v1_task008(in_dir: str, out_dir: str, *, case_id: str, folds: str = "0") -> str:
     """
@@ -47,15 +167,63 @@ def nnunet_v1_task008(in_dir: str, out_dir: str, *, case_id: str, folds: str = "
 
     raise RuntimeError(f"Task008: expected output not found: {expected}")
 
+_ts_pool = None
+_ts_pool_lock = threading.Lock()
+
+def _ts_worker_init() -> None:
+    # Same thread caps run() gives CLI subprocesses; set before torch is imported
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    os.environ.setdefault("MKL_NUM_THREADS", "1")
+
+def ts_pool() -> ProcessPoolExecutor:
+    """Single spawned worker that keeps TotalSegmentator imported between requests."""
+    global _ts_pool
+    with _ts_pool_lock:
+        if _ts_pool is None:
+            _ts_pool = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_ts_worker_init,
+            )
+        return _ts_pool
+
+def _discard_ts_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool (worker killed by CUDA OOM, segfault, OOM killer) so the next call respawns it."""
+    global _ts_pool
+    with _ts_pool_lock:
+        if _ts_pool is pool:
+            _ts_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _ts_liver_inproc(in_path: str, out_dir: str, fast: bool) -> None:
+    # Runs inside the ts_pool() worker; the import is cached there after the first call
+    from totalsegmentator.python_api import totalsegmentator
+    totalsegmentator(in_path, out_dir, roi_subset=["liver"], fast=fast)
+
 def totalseg_liver_only(in_path: str, out_dir: str, fast: bool = False) -> str:
     """
     Predictable TS liver mask using roi_subset.
     Output is always <out_dir>/liver.nii.gz if successful.
     """
-    flags = ["--fast"] if fast else []
-    flag_str = " ".join(flags)
-    cmd = f"TotalSegmentator -i {in_path} -o {out_dir} --roi_subset liver {flag_str}".strip()
-    run(cmd, env=os.environ.copy())
+    if TS_WORKER:
+        # A dead worker leaves the pool permanently broken: respawn it and retry once
+        for attempt in range(2):
+            pool = ts_pool()
+            try:
+                pool.submit(_ts_liver_inproc, in_path, out_dir, fast).result()
+                break
+            except BrokenProcessPool as e:
+                _discard_ts_pool(pool)
+                print("[ts-worker] worker died; respawning", flush=True)
+                if attempt:
+                    raise subprocess.CalledProcessError(1, "totalsegmentator(python_api)", output=repr(e)) from e
+            except Exception as e:
+                raise subprocess.CalledProcessError(1, "totalsegmentator(python_api)", output=repr(e)) from e
+    else:
+        flags = ["--fast"] if fast else []
+        flag_str = " ".join(flags)
+        cmd = f"TotalSegmentator -i {in_path} -o {out_dir} --roi_subset liver {flag_str}".strip()
+        run(cmd, env=os.environ.copy())
     out_path = os.path.join(out_dir, "liver.nii.gz")
     if not os.path.exists(out_path):
         got = [p for p in os.listdir(out_dir) if p.endswith(".nii.gz")]
@@ -102,59 +270,64 @@ def version():
     return info
 
 @app.post("/segment/task008")
-async def segment_task008(ct: UploadFile = File(...), folds: str = "0"):
+async def segment_task008(ct: UploadFile = File(...), folds: str = "0", background_tasks: BackgroundTasks = None):
     cid = f"case_{uuid.uuid4().hex[:8]}"
     in_dir, out_dir = os.path.join(IN_ROOT, cid), os.path.join(OUT_ROOT, cid)
     os.makedirs(in_dir, exist_ok=True); os.makedirs(out_dir, exist_ok=True)
+    if background_tasks:
+        cleanup_later(background_tasks, in_dir, out_dir)
 
     in_path = os.path.join(in_dir, f"{cid}_0000.nii.gz")
-    with open(in_path, "wb") as f:
-        f.write(await ct.read())
+    await save_upload(ct, in_path)
 
     t0 = time.time()
     try:
-        out_path = nnunet_v1_task008(in_dir, out_dir, case_id=cid, folds=folds)
+        out_path = await asyncio.to_thread(nnunet_v1_task008, in_dir, out_dir, case_id=cid, folds=folds)
     except subprocess.CalledProcessError as e:
         return JSONResponse(status_code=500, content={"error": "Task008 failed", "detail": e.stderr or e.output})
 
     print(f"[task008] {cid} done in {time.time()-t0:.1f}s", flush=True)
-    return FileResponse(out_path, media_type="application/gzip", filename=f"{cid}_task008.nii.gz")
+    return ZeroCopyFileResponse(out_path, media_type="application/gzip", filename=f"{cid}_task008.nii.gz")
 
 @app.post("/segment/liver")
-async def segment_liver(ct: UploadFile = File(...), fast: bool = False):
+async def segment_liver(ct: UploadFile = File(...), fast: bool = False, background_tasks: BackgroundTasks = None):
     """
     TotalSegmentator liver-only, predictable output liver.nii.gz.
     """
     cid = f"case_{uuid.uuid4().hex[:8]}"
     in_dir, out_dir = os.path.join(IN_ROOT, cid), os.path.join(OUT_ROOT, cid)
     os.makedirs(in_dir, exist_ok=True); os.makedirs(out_dir, exist_ok=True)
+    if background_tasks:
+        cleanup_later(background_tasks, in_dir, out_dir)
     in_path = os.path.join(in_dir, f"{cid}.nii.gz")
-    with open(in_path, "wb") as f: f.write(await ct.read())
+    await save_upload(ct, in_path)
     t0 = time.time()
     try:
-        out_path = totalseg_liver_only(in_path, out_dir, fast=fast)
+        out_path = await asyncio.to_thread(totalseg_liver_only, in_path, out_dir, fast=fast)
     except subprocess.CalledProcessError as e:
         return JSONResponse(status_code=500, content={"error": "TotalSegmentator liver failed", "detail": e.stderr or e.output})
     print(f"[liver] {cid} done in {time.time()-t0:.1f}s", flush=True)
-    return FileResponse(out_path, media_type="application/gzip", filename=f"{cid}_liver.nii.gz")
+    return ZeroCopyFileResponse(out_path, media_type="application/gzip", filename=f"{cid}_liver.nii.gz")
 
 @app.post("/segment/totalseg")
-async def segment_totalseg(ct: UploadFile = File(...), fast: bool = False):
+async def segment_totalseg(ct: UploadFile = File(...), fast: bool = False, background_tasks: BackgroundTasks = None):
     """
     Optional: multi-label output for debugging/research.
     """
     cid = f"case_{uuid.uuid4().hex[:8]}"
     in_dir, out_dir = os.path.join(IN_ROOT, cid), os.path.join(OUT_ROOT, cid)
     os.makedirs(in_dir, exist_ok=True); os.makedirs(out_dir, exist_ok=True)
+    if background_tasks:
+        cleanup_later(background_tasks, in_dir, out_dir)
     in_path = os.path.join(in_dir, f"{cid}.nii.gz")
-    with open(in_path, "wb") as f: f.write(await ct.read())
+    await save_upload(ct, in_path)
     t0 = time.time()
     try:
-        out_path = totalseg_multilabel(in_path, out_dir, fast=fast)
+        out_path = await asyncio.to_thread(totalseg_multilabel, in_path, out_dir, fast=fast)
     except subprocess.CalledProcessError as e:
         return JSONResponse(status_code=500, content={"error": "TotalSegmentator multi-label failed", "detail": e.stderr or e.output})
     print(f"[totalseg-ml] {cid} done in {time.time()-t0:.1f}s", flush=True)
-    return FileResponse(out_path, media_type="application/gzip", filename=f"{cid}_totalseg.nii.gz")
+    return ZeroCopyFileResponse(out_path, media_type="application/gzip", filename=f"{cid}_totalseg.nii.gz")
 
 @app.post("/segment/both")
 async def segment_both(
@@ -171,25 +344,25 @@ async def segment_both(
     os.makedirs(case_in, exist_ok=True)
     os.makedirs(out_ts, exist_ok=True)
     os.makedirs(out_t8, exist_ok=True)
+    if background_tasks:
+        cleanup_later(background_tasks, case_in, case_root)
 
-    # Write once; TS uses raw, nnUNet v1 needs _0000
+    # Write once; TS uses raw, nnUNet v1 needs _0000 (hardlinked, no second write)
     raw_ct = os.path.join(case_in, f"{cid}.nii.gz")
     ct_v1  = os.path.join(case_in, f"{cid}_0000.nii.gz")
-    data = await ct.read()
-    with open(raw_ct, "wb") as f: f.write(data)
-    with open(ct_v1,  "wb") as f: f.write(data)
-
-    timings = {}
+    await save_upload(ct, raw_ct)
+    link_or_copy(raw_ct, ct_v1)
 
-    # TotalSegmentator liver-only
+    # TotalSegmentator liver-only and Task008 are independent; run them side by side
     t = time.time()
-    liver_path = totalseg_liver_only(raw_ct, out_ts, fast=fast)  # -> <out_ts>/liver.nii.gz
-    timings["liver_s"] = round(time.time() - t, 2)
-
-    # Task008
-    t = time.time()
-    t8_path = nnunet_v1_task008(case_in, out_t8, case_id=cid, folds=folds)  # -> <out_t8>/<cid>.nii.gz
-    timings["task008_s"] = round(time.time() - t, 2)
+    try:
+        (liver_path, liver_s), (t8_path, task008_s) = await asyncio.gather(
+            timed(totalseg_liver_only, raw_ct, out_ts, fast=fast),                 # -> <out_ts>/liver.nii.gz
+            timed(nnunet_v1_task008, case_in, out_t8, case_id=cid, folds=folds),  # -> <out_t8>/<cid>.nii.gz
+        )
+    except subprocess.CalledProcessError as e:
+        return JSONResponse(status_code=500, content={"error": "Segmentation failed", "detail": e.stderr or e.output})
+    timings = {"liver_s": liver_s, "task008_s": task008_s, "total_s": round(time.time() - t, 2)}
 
     # Normalize names into a "package" dir so the zip is simple
     pkg_dir = os.path.join(case_root, "package")
@@ -197,8 +370,8 @@ async def segment_both(
 
     final_liver = os.path.join(pkg_dir, "liver.nii.gz")
     final_task8 = os.path.join(pkg_dir, "task008.nii.gz")
-    shutil.copy2(liver_path, final_liver)
-    shutil.copy2(t8_path, final_task8)
+    link_or_copy(liver_path, final_liver)
+    link_or_copy(t8_path, final_task8)
 
     meta = {
         "case_id": cid,
@@ -207,14 +380,42 @@ async def segment_both(
         **timings,
     }
     meta_path = os.path.join(pkg_dir, "meta.json")
-    with open(meta_path, "w") as f:
-        json.dump(meta, f)
+    if orjson is not None:
+        with open(meta_path, "wb") as f:
+            f.write(orjson.dumps(meta, option=orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
 
-    zip_path = shutil.make_archive(os.path.join("/tmp", f"{cid}_results"), "zip", pkg_dir)
+    # Payloads are already gzipped; store them instead of deflating a second time
+    zip_path = os.path.join("/tmp", f"{cid}_results.zip")
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for name in ("liver.nii.gz", "task008.nii.gz", "meta.json"):
+            zf.write(os.path.join(pkg_dir, name), name)
 
     if background_tasks:
-        background_tasks.add_task(shutil.rmtree, case_in, ignore_errors=True)
-        background_tasks.add_task(shutil.rmtree, case_root, ignore_errors=True)
         background_tasks.add_task(os.remove, zip_path)
 
-    return FileResponse(zip_path, media_type="application/zip", filename=f"{cid}_results.zip")
+    return ZeroCopyFileResponse(zip_path, media_type="application/zip", filename=f"{cid}_results.zip")
+
+
+if __name__ == "__main__":
+    # uvloop + httptools when installed (pip install "uvicorn[standard]"); the
+    # default asyncio loop otherwise. One worker by default: every worker can
+    # launch its own TotalSegmentator/nnU-Net jobs on the shared GPU, so raise
+    # HPB_WORKERS only when the GPU has room for that many concurrent models.
+    import uvicorn
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "auto"
+    uvicorn.run(
+        "server:app",
+        host=os.environ.get("HPB_HOST", "0.0.0.0"),
+        port=int(os.environ.get("HPB_PORT", "8080")),
+        loop=loop,
+        workers=int(os.environ.get("HPB_WORKERS", "1")),
+        limit_concurrency=int(os.environ.get("HPB_LIMIT_CONCURRENCY", "8")),
+        timeout_keep_alive=30,
+    )
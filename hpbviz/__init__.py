@@ -1,6 +1,7 @@
 
 __all__ = [
     "io",
+    "cache",
     "preprocess",
     "segment",
     "mesh",
@@ -1,13 +1,28 @@
 import argparse
+import atexit
+import importlib
 import logging
-from functools import lru_cache
+import os
+import queue
+import re
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Dict, Tuple, List
 
 import SimpleITK as sitk
 import numpy as np
 
-from .mesh import MeshBuilder
+from .cache import (
+    LRUCache,
+    fingerprint_inputs,
+    load_catalog_index,
+    load_surfaces,
+    store_catalog_index,
+    store_surfaces,
+)
+from .mesh import EmptyMaskError, MeshBuilder
 from .io import load_dicom_series, save_mesh, list_dicom_series
 
 log = logging.getLogger("hpbviz.pipeline")
@@ -33,25 +48,104 @@ VSNET_LABELS: Dict[int, Tuple[str, RGBA]] = {
     2: ("portal_vein",   (0.10, 0.75, 0.85, 0.80)),
 }
 
+# Bump whenever meshing output changes so stale on-disk mesh caches are ignored.
+PIPELINE_VERSION = 2
+
 # ---- Core utilities ----------------------------------------------------------
 
-def _resample_mask_to_image(mask: sitk.Image, reference: sitk.Image) -> sitk.Image:
-    same_geometry = (
-        mask.GetSize() == reference.GetSize()
-        and mask.GetSpacing() == reference.GetSpacing()
-        and mask.GetOrigin() == reference.GetOrigin()
-        and mask.GetDirection() == reference.GetDirection()
-    )
-    if same_geometry:
+_GEOMETRY_TOL = 1e-5
+_LPS_IDENTITY = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0)
+_ZERO_ORIGIN = (0.0, 0.0, 0.0)
+# Liver + Task08 + VSNet are meshed side by side
+_MESH_WORKERS = max(1, min(3, os.cpu_count() or 1))
+
+# Mask/mesh/cache writes run here so they overlap with meshing and viewer
+# startup; pending writes are flushed before the interpreter exits.
+_io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hpbviz-io")
+atexit.register(_io_executor.shutdown, wait=True)
+
+
+# Futures of writes the user asked for (--save-mask, --export); main() joins
+# them so a failed write still fails the run.
+_required_writes: list[Future] = []
+_required_writes_lock = threading.Lock()
+
+
+def _submit_io(fn, *args, done_msg: Optional[str] = None, required: bool = False, **kwargs) -> Future:
+    """
+    Run a write on the I/O executor. Best-effort writes only log failures;
+    required ones are kept for wait_for_outputs(), which re-raises them.
+    """
+    future = _io_executor.submit(fn, *args, **kwargs)
+
+    def _report(f: Future) -> None:
+        exc = f.exception()
+        if exc is not None:
+            if required:
+                log.error("[pipeline] write failed: %s", exc)
+            else:
+                log.warning("[pipeline] background write failed: %s", exc)
+        elif done_msg:
+            log.info(done_msg)
+
+    future.add_done_callback(_report)
+    if required:
+        with _required_writes_lock:
+            _required_writes.append(future)
+    return future
+
+
+def wait_for_outputs() -> None:
+    """Block until requested mask/mesh writes finish; re-raise the first failure."""
+    with _required_writes_lock:
+        pending = list(_required_writes)
+        _required_writes.clear()
+    for future in pending:
+        future.result()
+
+
+def _geometry(image: sitk.Image) -> tuple:
+    return image.GetSize(), image.GetSpacing(), image.GetOrigin(), image.GetDirection()
+
+
+def same_geometry(a: sitk.Image, b: sitk.Image, tol: float = _GEOMETRY_TOL) -> bool:
+    """
+    True if both images share size, spacing, origin and direction (within tol).
+    Each image is queried once; exact tuple equality settles the common case
+    without building any arrays.
+    """
+    geom_a, geom_b = _geometry(a), _geometry(b)
+    if geom_a == geom_b:
+        return True
+    if geom_a[0] != geom_b[0]:
+        return False
+    return all(np.allclose(x, y, atol=tol) for x, y in zip(geom_a[1:], geom_b[1:]))
+
+
+def _resample_mask_to_image(
+    mask: sitk.Image,
+    reference: sitk.Image,
+    pixel_type: Optional[int] = None,
+) -> sitk.Image:
+    """
+    Put mask on the reference grid, optionally converting to pixel_type in the same pass.
+    Grids that match up to floating-point noise are adopted as-is (no resample).
+    """
+    pixel_type = mask.GetPixelID() if pixel_type is None else pixel_type
+    if same_geometry(mask, reference):
+        if mask.GetPixelID() != pixel_type:
+            mask = sitk.Cast(mask, pixel_type)
+        mask.CopyInformation(reference)
         return mask
 
+    # Nearest-neighbour resample writes the target pixel type directly (no separate Cast pass)
     resampled = sitk.Resample(
         mask,
         reference,
         sitk.Transform(),
         sitk.sitkNearestNeighbor,
         0,
-        mask.GetPixelID(),
+        pixel_type,
     )
     resampled.CopyInformation(reference)
     return resampled
@@ -60,19 +154,84 @@ def _resample_mask_to_image(mask: sitk.Image, reference: sitk.Image) -> sitk.Ima
 def _canonicalize_image(image: sitk.Image) -> sitk.Image:
     """
     Orient the image to LPS with identity direction and zero origin for consistent visualization.
+    Images that are already LPS skip DICOMOrient's voxel copy and are re-origined in place.
     """
-    oriented = sitk.DICOMOrient(image, "LPS")
-    oriented.SetOrigin((0.0, 0.0, 0.0))
+    if image.GetDirection() == _LPS_IDENTITY:
+        if image.GetOrigin() == _ZERO_ORIGIN:
+            return image  # already canonical: pure geometry check, no mutation
+        oriented = image
+    else:
+        oriented = sitk.DICOMOrient(image, "LPS")
+    oriented.SetOrigin(_ZERO_ORIGIN)
     return oriented
 
 
+def _image_nbytes(image: sitk.Image) -> int:
+    return (
+        image.GetNumberOfPixels()
+        * image.GetNumberOfComponentsPerPixel()
+        * image.GetSizeOfPixelComponent()
+    )
+
+
+# Resampled masks keyed by (file identity, reference grid); shared read-only
+_mask_cache = LRUCache(max_entries=32, max_bytes=512 * 1024 * 1024, sizeof=_image_nbytes)
+_mask_locks: Dict[tuple, threading.Lock] = {}
+_mask_locks_guard = threading.Lock()
+
+
 def _read_mask_like(ref_img: sitk.Image, path: str) -> sitk.Image:
     """
-    Read a mask file, cast to uint8, resample onto ref_img grid, canonicalize once.
+    Read a mask file and resample it onto ref_img's grid as uint8.
+    ref_img is expected to be canonical already, so the result inherits its
+    orientation and zero origin; no second DICOMOrient pass is needed.
+    Results are memoized on path, mtime, size and the reference geometry, so
+    revisiting a case skips the read and resample; treat them as read-only.
+    """
+    st = os.stat(path)
+    key = (os.path.realpath(path), st.st_mtime_ns, st.st_size, _geometry(ref_img))
+    cached = _mask_cache.get(key)
+    if cached is not None:
+        return cached
+    # Task08 and VSNet masks load concurrently; if both name the same file,
+    # the second caller waits for the first read instead of repeating it.
+    with _mask_locks_guard:
+        lock = _mask_locks.setdefault(key, threading.Lock())
+    try:
+        with lock:
+            cached = _mask_cache.get(key)
+            if cached is not None:
+                return cached
+            # The reader converts to uint8 while loading, so the same-grid path needs no Cast pass
+            m = _resample_mask_to_image(sitk.ReadImage(path, sitk.sitkUInt8), ref_img, sitk.sitkUInt8)
+            if m.GetDirection() != ref_img.GetDirection() or m.GetOrigin() != ref_img.GetOrigin():
+                raise ValueError(f"Mask {path} did not land on the reference grid after resampling.")
+            _mask_cache.put(key, m)
+            return m
+    finally:
+        with _mask_locks_guard:
+            _mask_locks.pop(key, None)
+
+
+_BINCOUNT_CHUNK = 1 << 22
+
+
+def _label_counts(labels: np.ndarray, minlength: int = 256) -> np.ndarray:
+    """
+    Voxel count per label value (O(N), no sort). np.bincount widens its input
+    to intp, so the volume is fed in fixed-size chunks to keep that temporary
+    small instead of 8x the mask size.
     """
-    m = sitk.Cast(sitk.ReadImage(path), sitk.sitkUInt8)
-    m = _resample_mask_to_image(m, ref_img)
-    return _canonicalize_image(m)
+    flat = labels.reshape(-1)
+    counts = np.zeros(minlength, dtype=np.int64)
+    for start in range(0, flat.size, _BINCOUNT_CHUNK):
+        part = np.bincount(flat[start : start + _BINCOUNT_CHUNK], minlength=minlength)
+        if part.size > counts.size:
+            part[: counts.size] += counts
+            counts = part
+        else:
+            counts[: part.size] += part
+    return counts
 
 
 def _build_surface(
@@ -81,41 +240,52 @@ def _build_surface(
     name: str,
     color: RGBA,
     label: Optional[int] = None,
+    method: str = "flying_edges",
 ) -> Optional[Dict[str, np.ndarray]]:
     """
     Centralized meshing with correct axis/spacing handling and guardrails.
     Returns a dict compatible with your viewer: {'vertices','faces','color', ...}
     """
-    arr = sitk.GetArrayFromImage(mask_img).astype(np.uint8)  # (z, y, x)
-    if label is None:
-        mask_arr = (arr > 0).astype(np.uint8)
-    else:
-        mask_arr = (arr == label).astype(np.uint8)
-    if not np.any(mask_arr):
-        log.info("[mesh] '%s' is empty (label=%s)", name, label)
-        return None
-
+    view = sitk.GetArrayViewFromImage(mask_img)  # (z, y, x), zero-copy
     spacing = mask_img.GetSpacing()
     origin = mask_img.GetOrigin()
     try:
-        mesh = mesh_builder.mask_to_surface(
-            mask_arr,
-            spacing=spacing,
-            origin=origin,
-            label=None,
-        )
+        if label is None:
+            # The uint8 view is handed over as-is: the mesher finds the occupied
+            # block on it and thresholds only that block.
+            mesh = mesh_builder.mask_to_surface(
+                view, spacing=spacing, origin=origin, label=None, sparse=True, method=method
+            )
+        else:
+            # Threshold straight into the bool buffer handed to the mesher (one pass, one allocation)
+            mask_arr = np.empty(view.shape, dtype=np.bool_)
+            np.equal(view, label, out=mask_arr)
+            mesh = mesh_builder.mask_to_surface_bool(
+                mask_arr, spacing=spacing, origin=origin, sparse=True, method=method
+            )
+    except EmptyMaskError:
+        log.info("[mesh] '%s' is empty (label=%s)", name, label)
+        return None
     except ValueError as e:
         log.warning("[mesh] '%s' marching cubes failed: %s", name, e)
         return None
 
-    v = mesh.get("vertices", np.array([]))
-    f = mesh.get("faces", np.array([]))
-    if v.size == 0 or f.size == 0:
+    return _finish_surface(mesh, name, color)
+
+
+def _finish_surface(
+    mesh: Dict[str, np.ndarray],
+    name: str,
+    color: RGBA,
+) -> Optional[Dict[str, np.ndarray]]:
+    """Reject empty geometry and attach color/display name."""
+    v = mesh.get("vertices")
+    f = mesh.get("faces")
+    if v is None or f is None or v.size == 0 or f.size == 0:
         log.info("[mesh] '%s' produced empty geometry", name)
         return None
 
     mesh["color"] = color
-    mesh.setdefault("color", color)
     mesh.setdefault("display_name", name)
     return mesh
 
@@ -133,12 +303,27 @@ def _add_labeled_surfaces(
     if not mask_path:
         return
     m_img = _read_mask_like(ref_img, mask_path)
-    arr = sitk.GetArrayFromImage(m_img)
-    present = sorted(int(v) for v in np.unique(arr) if int(v) in label_map)
+    # One counting pass over the uint8 labels replaces np.unique's sort and the
+    # per-label full-volume scans for labels that are not there at all.
+    counts = _label_counts(sitk.GetArrayViewFromImage(m_img))
+    present = sorted(label for label in label_map if 0 <= label < counts.size and counts[label])
     log.info("[pipeline] %s labels present: %s", log_tag, present)
 
+    # All present labels are meshed from one shared sub-block of the volume
+    meshes = mesh_builder.masks_to_surfaces(
+        sitk.GetArrayViewFromImage(m_img),
+        present,
+        spacing=m_img.GetSpacing(),
+        origin=m_img.GetOrigin(),
+    )
     for label, (name, color) in label_map.items():
-        s = _build_surface(mesh_builder, m_img, name=name, color=color, label=label)
+        if label not in present:
+            continue
+        mesh = meshes.get(label)
+        if mesh is None:
+            log.warning("[mesh] '%s' marching cubes produced no surface", name)
+            continue
+        s = _finish_surface(mesh, name, color)
         if s:
             if set_display_name:
                 s["display_name"] = name.replace("_", " ").title()
@@ -162,76 +347,139 @@ def _case_name_from_path(path: str) -> str:
     return base or "case"
 
 
+_MASK_TOKENS_RE = re.compile("mask|liver|task008|hepatic|tumor|vsnet|seg|label|manual")
+_DISCOVERY_WORKERS = 16
+
+
+_NIFTI_SUFFIXES = (".nii", ".nii.gz")
+# (substrings, slot) in priority order: a file fills the first empty slot it matches
+_OUTPUT_MASK_SLOTS = (
+    (("liver",), "liver_mask"),
+    (("task008", "tumor"), "task008_mask"),
+    (("vsnet", "inputvsnet", "manual"), "manual_mask"),
+)
+
+
+def _by_path(item: Tuple[str, str]) -> str:
+    return item[1]
+
+
+def _list_nifti(directory: str) -> List[Tuple[str, str]]:
+    """
+    (name_lower, path) pairs of the NIfTI files in one directory, in
+    case-sensitive path order; the lowercased name is only for matching.
+    """
+    try:
+        with os.scandir(directory) as it:
+            return sorted(
+                ((e.name.lower(), e.path) for e in it if e.name.endswith(_NIFTI_SUFFIXES)),
+                key=_by_path,
+            )
+    except OSError:
+        return []
+
+
+def _scan_root(root: Path) -> List[os.DirEntry]:
+    if not root.is_dir():
+        return []
+    with os.scandir(root) as it:
+        return list(it)
+
+
 def _discover_cases(raw_root: str, output_root: str) -> dict[str, dict[str, str]]:
     cases: dict[str, dict[str, str]] = {}
-    raw_root_path = Path(raw_root).expanduser()
-    output_root_path = Path(output_root).expanduser()
-
-    def _register_case(
-        case: str,
-        *,
-        volume: Optional[Path] = None,
-        liver: Optional[Path] = None,
-        task: Optional[Path] = None,
-        manual: Optional[Path] = None,
-    ) -> None:
+    # Resolve the roots once so every scandir path below them is already
+    # absolute; only the paths that end up in the catalog get a realpath().
+    raw_root_path = Path(raw_root).expanduser().resolve()
+    output_root_path = Path(output_root).expanduser().resolve()
+
+    def _register_case(case: str, volume: Optional[str] = None, **masks: Optional[str]) -> None:
         entry = cases.setdefault(case, {})
         if volume and "dicom_path" not in entry:
-            entry["dicom_path"] = str(volume.resolve())
-        if liver:
-            entry["liver_mask"] = str(liver.resolve())
-        if task:
-            entry["task008_mask"] = str(task.resolve())
-        if manual:
-            entry["manual_mask"] = str(manual.resolve())
-
-    def _pick_volume_candidate(files: List[Path]) -> Optional[Path]:
-        mask_tokens = ("mask", "liver", "task008", "hepatic", "tumor", "vsnet", "seg", "label", "manual")
-        for candidate in files:
-            name = candidate.name.lower()
-            if not any(token in name for token in mask_tokens):
-                return candidate
-        return files[0] if files else None
-
-    if output_root_path.is_dir():
-        for out_entry in output_root_path.iterdir():
-            if out_entry.is_dir():
-                nii_files = sorted(out_entry.glob("*.nii*"))
-                liver_mask = None
-                task008_mask = None
-                manual_mask = None
-                for candidate in nii_files:
-                    name_lower = candidate.name.lower()
-                    if "liver" in name_lower and liver_mask is None:
-                        liver_mask = candidate
-                    elif (
-                        "task008" in name_lower or "tumor" in name_lower
-                    ) and task008_mask is None:
-                        task008_mask = candidate
-                    elif (
-                        "vsnet" in name_lower or "inputvsnet" in name_lower or "manual" in name_lower
-                    ) and manual_mask is None:
-                        manual_mask = candidate
-                base = _pick_volume_candidate(nii_files)
-                case = _case_name_from_path(out_entry.name)
-                _register_case(case, volume=base, liver=liver_mask, task=task008_mask, manual=manual_mask)
-            elif out_entry.suffix in {".nii", ".gz"}:
-                case = _case_name_from_path(out_entry.name)
-                _register_case(case, volume=out_entry)
-
-    if raw_root_path.is_dir():
-        for raw_entry in raw_root_path.iterdir():
-            if raw_entry.is_dir():
-                nii_files = sorted(raw_entry.glob("*.nii*"))
-                chosen = _pick_volume_candidate(nii_files)
-                case = _case_name_from_path(raw_entry.name)
-                target = chosen or raw_entry
-                _register_case(case, volume=target)
-            elif raw_entry.suffix in {".nii", ".gz"}:
-                case = _case_name_from_path(raw_entry.name)
-                _register_case(case, volume=raw_entry)
-
-    return {case: info for case, info in cases.items() if info.get("dicom_path")}
+            entry["dicom_path"] = volume
+        for key, path in masks.items():
+            if path:
+                entry[key] = path
+
+    def _pick_volume_candidate(files: List[Tuple[str, str]]) -> Optional[str]:
+        for name_lower, path in files:
+            if not _MASK_TOKENS_RE.search(name_lower):
+                return path
+        return files[0][1] if files else None
+
+    # scandir gives cached d_type for the is_dir() checks; the per-case listings
+    # are independent (and slow on network filesystems), so fan them out.
+    out_entries = _scan_root(output_root_path)
+    raw_entries = _scan_root(raw_root_path)
+    out_is_dir = [e.is_dir() for e in out_entries]
+    raw_is_dir = [e.is_dir() for e in raw_entries]
+    dir_entries = [e for e, d in zip(out_entries, out_is_dir) if d]
+    dir_entries += [e for e, d in zip(raw_entries, raw_is_dir) if d]
+
+    # A directory's mtime changes whenever entries are added, removed or
+    # renamed, so unchanged case folders reuse the listing from the last run.
+    index = load_catalog_index()
+    listings: dict[str, List[Tuple[str, str]]] = {}
+    stale: list[str] = []
+    mtimes: dict[str, int] = {}
+    for e in dir_entries:
+        try:
+            mtimes[e.path] = e.stat().st_mtime_ns
+        except OSError:
+            mtimes[e.path] = -1
+        hit = index.get(e.path)
+        if hit and hit[0] == mtimes[e.path]:
+            # Re-sorted so listings cached by older versions follow path order too
+            listings[e.path] = sorted((tuple(item) for item in hit[1]), key=_by_path)
+        else:
+            stale.append(e.path)
+    if stale:
+        with ThreadPoolExecutor(max_workers=min(_DISCOVERY_WORKERS, len(stale))) as ex:
+            listings.update(zip(stale, ex.map(_list_nifti, stale)))
+        # Merge into the stored index so listings for other case roots survive.
+        # Directories under these roots that were not seen are gone; entries
+        # from other roots are kept only while their directory still exists.
+        roots = tuple(str(root) + os.sep for root in (raw_root_path, output_root_path))
+        merged = {
+            path: hit
+            for path, hit in index.items()
+            if path not in mtimes and not path.startswith(roots) and os.path.isdir(path)
+        }
+        merged.update({path: [mtimes[path], listings[path]] for path in mtimes})
+        store_catalog_index(merged)
+
+    for out_entry, is_dir in zip(out_entries, out_is_dir):
+        if is_dir:
+            nii_files = listings[out_entry.path]
+            masks: dict[str, str] = {}
+            for name_lower, path in nii_files:
+                for tokens, slot in _OUTPUT_MASK_SLOTS:
+                    if slot not in masks and any(t in name_lower for t in tokens):
+                        masks[slot] = path
+                        break
+                if len(masks) == len(_OUTPUT_MASK_SLOTS):
+                    break
+            base = _pick_volume_candidate(nii_files)
+            case = _case_name_from_path(out_entry.name)
+            _register_case(case, volume=base, **masks)
+        elif out_entry.name.endswith(_NIFTI_SUFFIXES):
+            case = _case_name_from_path(out_entry.name)
+            _register_case(case, volume=out_entry.path)
+
+    for raw_entry, is_dir in zip(raw_entries, raw_is_dir):
+        if is_dir:
+            chosen = _pick_volume_candidate(listings[raw_entry.path])
+            case = _case_name_from_path(raw_entry.name)
+            _register_case(case, volume=chosen or raw_entry.path)
+        elif raw_entry.name.endswith(_NIFTI_SUFFIXES):
+            case = _case_name_from_path(raw_entry.name)
+            _register_case(case, volume=raw_entry.path)
+
+    return {
+        case: {key: os.path.realpath(path) for key, path in info.items()}
+        for case, info in cases.items()
+        if info.get("dicom_path")
+    }
 
 # ---- Pipeline ---------------------------------------------------------------
 
@@ -243,9 +491,13 @@ def run_pipeline(
     save_mask_path: str | None = None,
     task008_mask_path: str | None = None,
     manual_mask_path: str | None = None,
+    use_cache: bool = True,
 ):
     """
     Run meshing pipeline with provided masks (no local segmentation).
+    Surfaces are cached on disk keyed by the input file contents (see hpbviz.cache).
+    The mask/mesh exports are written in the background; call wait_for_outputs()
+    to wait for them and surface write errors.
     Returns: (img, surfaces, mask_img) for viewer compatibility.
     """
     # 1) Load & canonicalize reference image once
@@ -254,58 +506,117 @@ def run_pipeline(
     # 2) Liver mask is required (no AutoLiver fallback)
     if not liver_mask_path:
         raise RuntimeError("Liver mask is required. No local segmentation fallback is available.")
-    mask_img = _read_mask_like(img, liver_mask_path)
-
-    if save_mask_path:
-        sitk.WriteImage(mask_img, save_mask_path)
-        log.info("[pipeline] saved liver mask to %s", save_mask_path)
-
-    # 3) Build surfaces via shared helper
-    mesh_builder = MeshBuilder()
-    surfaces: dict[str, dict[str, np.ndarray]] = {}
 
-    # Liver
-    liver_surface = _build_surface(mesh_builder, mask_img, name="liver", color=(1.0, 0.0, 0.0, 1.0))
-    if liver_surface:
-        surfaces["liver"] = liver_surface
-    else:
-        log.info("[pipeline] liver surface empty")
-
-    # Task08 (optional)
-    _add_labeled_surfaces(
-        mesh_builder=mesh_builder,
-        ref_img=img,
-        mask_path=task008_mask_path,
-        label_map=TASK08_LABELS,
-        surfaces=surfaces,
-        log_tag="Task08",
-        set_display_name=True,  # keep previous behavior
-    )
+    cache_key = None
+    surfaces: Optional[dict[str, dict[str, np.ndarray]]] = None
+    task08_surfaces: dict[str, dict[str, np.ndarray]] = {}
+    vsnet_surfaces: dict[str, dict[str, np.ndarray]] = {}
+
+    # Mask reads (decompress + resample) and meshing run in native code, so they
+    # overlap: the liver mask loads while the cache key is computed, and on a
+    # miss the Task08/VSNet masks load alongside it. Results merge in order below.
+    with ThreadPoolExecutor(max_workers=_MESH_WORKERS) as pool:
+        liver_read = pool.submit(_read_mask_like, img, liver_mask_path)
+
+        # 3) Build surfaces via shared helper (or reuse a previous run's meshes)
+        if use_cache:
+            cache_key = fingerprint_inputs(
+                [input_path, liver_mask_path, task008_mask_path, manual_mask_path],
+                PIPELINE_VERSION,
+                series_uid,
+            )
+            surfaces = load_surfaces(cache_key)
+            if surfaces is not None:
+                log.info("[pipeline] loaded %d cached surfaces", len(surfaces))
+
+        if surfaces is None:
+            mesh_builder = MeshBuilder()
+            # Task08 (optional)
+            task08_job = pool.submit(
+                _add_labeled_surfaces,
+                mesh_builder=mesh_builder,
+                ref_img=img,
+                mask_path=task008_mask_path,
+                label_map=TASK08_LABELS,
+                surfaces=task08_surfaces,
+                log_tag="Task08",
+                set_display_name=True,  # keep previous behavior
+            )
+            # VSNet/manual (optional)
+            vsnet_job = pool.submit(
+                _add_labeled_surfaces,
+                mesh_builder=mesh_builder,
+                ref_img=img,
+                mask_path=manual_mask_path,
+                label_map=VSNET_LABELS,
+                surfaces=vsnet_surfaces,
+                log_tag="VSNet",
+                set_display_name=True,   # match your previous manual block
+            )
+            mask_img = liver_read.result()
+            liver_surface = _build_surface(mesh_builder, mask_img, name="liver", color=(1.0, 0.0, 0.0, 1.0))
+            task08_job.result()
+            vsnet_job.result()
+
+            surfaces = {}
+            if liver_surface:
+                surfaces["liver"] = liver_surface
+            else:
+                log.info("[pipeline] liver surface empty")
+            surfaces.update(task08_surfaces)
+            surfaces.update(vsnet_surfaces)
+            if cache_key:
+                _submit_io(store_surfaces, cache_key, surfaces)
+        else:
+            mask_img = liver_read.result()
 
-    # VSNet/manual (optional)
-    _add_labeled_surfaces(
-        mesh_builder=mesh_builder,
-        ref_img=img,
-        mask_path=manual_mask_path,
-        label_map=VSNET_LABELS,
-        surfaces=surfaces,
-        log_tag="VSNet",
-        set_display_name=True,   # match your previous manual block
-    )
+    if save_mask_path:
+        # ITK's own gzip already outpaces raw .nii + Python gzip(level=1) on masks,
+        # and the write is off the critical path anyway (see _submit_io).
+        _submit_io(
+            sitk.WriteImage, mask_img, save_mask_path, useCompression=True, compressionLevel=1,
+            done_msg=f"[pipeline] saved liver mask to {save_mask_path}",
+            required=True,
+        )
 
     # 4) Optional export (only if liver is present)
     if export_path and "liver" in surfaces:
-        save_mesh(
+        _submit_io(
+            save_mesh,
             {"vertices": surfaces["liver"]["vertices"], "faces": surfaces["liver"]["faces"], "color": surfaces["liver"]["color"]},
             export_path,
+            done_msg=f"[pipeline] exported liver mesh to {export_path}",
+            required=True,
         )
-        log.info("[pipeline] exported liver mesh to %s", export_path)
 
     # Maintain API compatibility: third return value is the mask image
     return img, surfaces, mask_img
 
+_CASE_CACHE_MB = 4096
+_PREFETCH_CASES = 3
+
+
+def _case_nbytes(result: tuple) -> int:
+    """Approximate resident size of a run_pipeline result (images + mesh arrays)."""
+    img, surfaces, mask_img = result
+    total = 0
+    for image in (img, mask_img):
+        if isinstance(image, sitk.Image):
+            total += _image_nbytes(image)
+    for surface in (surfaces or {}).values():
+        total += sum(v.nbytes for v in surface.values() if isinstance(v, np.ndarray))
+    return total
+
 # ---- CLI / Viewer -----------------------------------------------------------
 
+def _preload_viewer() -> None:
+    try:
+        importlib.import_module(".viewer", __package__)
+    except Exception:
+        # The foreground import will raise this again with full context
+        log.debug("[viewer] background import failed", exc_info=True)
+
+
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("input", nargs="?", default=None, help="Path to DICOM folder, single DICOM file, or NIfTI (.nii/.nii.gz)")
@@ -345,41 +656,59 @@ def main():
         help="Primary directory containing processed cases and masks for browsing",
     )
     p.add_argument("--list-series", action="store_true", help="List DICOM series in the given folder and exit")
+    p.add_argument("--no-mesh-cache", action="store_true", help="Always rebuild meshes instead of reusing the on-disk cache")
+    p.add_argument(
+        "--case-cache-mb",
+        type=int,
+        default=int(os.environ.get("HPBVIZ_CASE_CACHE_MB", _CASE_CACHE_MB)),
+        help="Memory budget for recently viewed cases (MB); env HPBVIZ_CASE_CACHE_MB",
+    )
+    p.add_argument("--no-prefetch", action="store_true", help="Do not pre-load the next cases in the background")
     args = p.parse_args()
 
+    # Qt/PyObjC module setup off the main thread is unsafe on macOS, so the
+    # background import is skipped there.
+    if not args.no_gui and not args.list_series and sys.platform != "darwin":
+        # napari/Qt/vispy take a noticeable time to import; do it while the
+        # pipeline runs. The later `from .viewer import ...` waits on the
+        # import lock and re-raises any import error itself.
+        threading.Thread(
+            target=_preload_viewer,
+            name="hpbviz-viewer-import",
+            daemon=True,
+        ).start()
+
     case_catalog = _discover_cases(args.raw_root, args.output_root)
 
-    def _resolve(path: Optional[str]) -> Optional[str]:
-        if not path:
-            return None
-        return str(Path(path).expanduser().resolve())
+    # Catalog paths are already real paths; only the CLI-supplied ones need
+    # normalizing, once each.
+    cli_paths = {
+        key: os.path.realpath(os.path.expanduser(value)) if value else None
+        for key, value in (
+            ("dicom_path", args.input),
+            ("liver_mask", args.liver_mask),
+            ("task008_mask", args.task008_mask),
+            ("manual_mask", args.manual_mask),
+        )
+    }
 
     if args.input:
-        input_path = Path(args.input).expanduser()
-        initial_source = str(input_path.resolve())
-        initial_case = _case_name_from_path(input_path.name)
+        initial_case = _case_name_from_path(Path(args.input).expanduser().name)
     else:
         if not case_catalog:
             print("No cases discovered in", args.raw_root)
             return
         initial_case = sorted(case_catalog.keys())[0]
-        initial_source = case_catalog[initial_case]["dicom_path"]
-        args.input = initial_source
+        args.input = case_catalog[initial_case]["dicom_path"]
 
     entry = case_catalog.setdefault(initial_case, {})
-    entry["dicom_path"] = _resolve(initial_source)
-
-    initial_liver = _resolve(args.liver_mask) if args.liver_mask else _resolve(entry.get("liver_mask"))
-    if initial_liver:
-        entry["liver_mask"] = initial_liver
+    for key, path in cli_paths.items():
+        if path:
+            entry[key] = path
 
-    initial_task = _resolve(args.task008_mask) if args.task008_mask else _resolve(entry.get("task008_mask"))
-    if initial_task:
-        entry["task008_mask"] = initial_task
-
-    initial_manual = _resolve(args.manual_mask) if args.manual_mask else _resolve(entry.get("manual_mask"))
-    if initial_manual:
-        entry["manual_mask"] = initial_manual
+    initial_liver = entry.get("liver_mask")
+    initial_task = entry.get("task008_mask")
+    initial_manual = entry.get("manual_mask")
 
     if args.list_series:
         if args.input:
@@ -408,48 +737,109 @@ def main():
         save_mask_path=args.save_mask,
         task008_mask_path=initial_task,
         manual_mask_path=initial_manual,
+        use_cache=not args.no_mesh_cache,
     )
     print("[pipeline] using provided masks")
 
     if not args.no_gui:
         from .viewer import HpbViewer
+        # The writes overlapped the pipeline and the viewer import; a failed
+        # --save-mask/--export must stop the run now, not after the session.
+        wait_for_outputs()
         initial_case = initial_case
         case_cache: dict[str, tuple[sitk.Image, dict[str, dict[str, np.ndarray]], sitk.Image]] = {
             initial_case: (img, surfaces, result)
         }
         catalog_for_viewer = case_catalog if not args.no_browser else None
         case_loader = None
+        case_prefetcher = None
 
         if catalog_for_viewer:
 
-            @lru_cache(maxsize=None)
+            recent_cases = LRUCache(
+                max_entries=None,
+                max_bytes=max(0, args.case_cache_mb) * 1024 * 1024,
+                sizeof=_case_nbytes,
+            )
+
+            case_locks: dict[str, threading.Lock] = {}
+            case_locks_guard = threading.Lock()
+
             def _load_case(name: str):
                 if name == initial_case:
                     return case_cache[initial_case]
+                cached = recent_cases.get(name)
+                if cached is not None:
+                    return cached
                 info = catalog_for_viewer.get(name)
                 if not info:
                     raise RuntimeError(f"No case data available for {name}")
-                return run_pipeline(
-                    info["dicom_path"],
-                    export_path=None,
-                    series_uid=None,
-                    liver_mask_path=info.get("liver_mask"),
-                    save_mask_path=None,
-                    task008_mask_path=info.get("task008_mask"),
-                    manual_mask_path=info.get("manual_mask"),
-                )
+                with case_locks_guard:
+                    lock = case_locks.setdefault(name, threading.Lock())
+                # A click on a case the prefetcher is building waits for it instead of rebuilding
+                with lock:
+                    cached = recent_cases.get(name)
+                    if cached is not None:
+                        return cached
+                    loaded = run_pipeline(
+                        info["dicom_path"],
+                        export_path=None,
+                        series_uid=None,
+                        liver_mask_path=info.get("liver_mask"),
+                        save_mask_path=None,
+                        task008_mask_path=info.get("task008_mask"),
+                        manual_mask_path=info.get("manual_mask"),
+                        use_cache=not args.no_mesh_cache,
+                    )
+                    recent_cases.put(name, loaded)
+                    return loaded
+
+            ordered = sorted(catalog_for_viewer)
+            pending: "queue.Queue[str]" = queue.Queue()
+
+            def _prefetch_worker() -> None:
+                while True:
+                    name = pending.get()
+                    try:
+                        _load_case(name)
+                    except Exception as exc:
+                        log.info("Prefetch of %s failed: %s", name, exc)
+
+            def _prefetch_after(current: str) -> None:
+                # Sequential browsing is the common pattern: warm the cases that
+                # follow the current one. The latest selection wins, so anything
+                # still queued for an earlier one is dropped.
+                while True:
+                    try:
+                        pending.get_nowait()
+                    except queue.Empty:
+                        break
+                start = ordered.index(current) + 1 if current in ordered else 0
+                for name in (ordered[start:] + ordered[:start])[:_PREFETCH_CASES]:
+                    if name != current and name != initial_case and name not in recent_cases:
+                        pending.put(name)
 
             case_loader = _load_case
 
+            if not args.no_prefetch:
+                # One daemon worker: loads run one at a time (meshing is already
+                # threaded) and never hold up interpreter exit.
+                threading.Thread(target=_prefetch_worker, name="hpbviz-prefetch", daemon=True).start()
+                case_prefetcher = _prefetch_after
+                _prefetch_after(initial_case)
+
         viewer = HpbViewer(
             image=img,
             show_controls=not args.no_controls,
             case_catalog=catalog_for_viewer,
             case_loader=case_loader,
             current_case=initial_case,
+            case_prefetcher=case_prefetcher,
         )
         viewer.show_with_surfaces(surfaces)
 
+    wait_for_outputs()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+import numpy as np
+
+CACHE_ROOT = Path(os.environ.get("HPBVIZ_CACHE_DIR", "~/.cache/3dhpb")).expanduser()
+MESH_CACHE_DIR = CACHE_ROOT / "meshes"
+
+DIGEST_INDEX = CACHE_ROOT / "digests.json"
+CATALOG_INDEX = CACHE_ROOT / "catalog.json"
+
+_HASH_BLOCK = 4 << 20
+# Oldest-touched entries beyond this are dropped when the index is written
+_DIGEST_INDEX_MAX = 100_000
+_digest_lock = threading.Lock()
+_digest_index: Optional[Dict[str, list]] = None
+_digest_dirty = False
+
+
+def _load_digest_index() -> Dict[str, list]:
+    global _digest_index
+    if _digest_index is None:
+        try:
+            _digest_index = json.loads(DIGEST_INDEX.read_text())
+        except (OSError, ValueError):
+            _digest_index = {}
+    return _digest_index
+
+
+def _write_json(path: Path, payload: Any) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        CACHE_ROOT.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(payload))
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def flush_digest_index() -> None:
+    """
+    Write the in-memory digest index to DIGEST_INDEX if it changed, dropping
+    entries for files that no longer exist and the oldest ones past
+    _DIGEST_INDEX_MAX. Called once per fingerprint_inputs and at exit.
+    """
+    global _digest_dirty
+    with _digest_lock:
+        if not _digest_dirty or _digest_index is None:
+            return
+        for key in [key for key in _digest_index if not os.path.exists(key)]:
+            del _digest_index[key]
+        for key in list(_digest_index)[: max(0, len(_digest_index) - _DIGEST_INDEX_MAX)]:
+            del _digest_index[key]
+        _write_json(DIGEST_INDEX, _digest_index)
+        _digest_dirty = False
+
+
+atexit.register(flush_digest_index)
+
+
+def file_digest(path: Path) -> str:
+    """
+    blake2b of a file's bytes, memoized on (size, mtime_ns) in memory and in
+    DIGEST_INDEX so unchanged inputs are never re-read just to build a cache key.
+    New digests only update memory; flush_digest_index persists them.
+    """
+    st = path.stat()
+    key = str(path.resolve())
+    with _digest_lock:
+        index = _load_digest_index()
+        hit = index.get(key)
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            return hit[2]
+
+    h = hashlib.blake2b(digest_size=20)
+    with path.open("rb") as fh:
+        while block := fh.read(_HASH_BLOCK):
+            h.update(block)
+    digest = h.hexdigest()
+
+    global _digest_dirty
+    with _digest_lock:
+        index = _load_digest_index()
+        # Re-insert so dict order tracks recency for the size cap
+        index.pop(key, None)
+        index[key] = [st.st_size, st.st_mtime_ns, digest]
+        _digest_dirty = True
+    return digest
+
+
+def fingerprint_inputs(paths: Iterable[Optional[str]], *extra: Any) -> str:
+    """
+    Content hash over the given files (directories hash every file inside, by
+    relative name) plus any extra values such as a pipeline version.
+    Missing/None paths contribute a placeholder so argument order stays significant.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    for raw in paths:
+        if not raw:
+            h.update(b"\0none\0")
+            continue
+        path = Path(raw)
+        if path.is_dir():
+            for child in sorted(p for p in path.rglob("*") if p.is_file()):
+                h.update(str(child.relative_to(path)).encode())
+                h.update(file_digest(child).encode())
+        else:
+            h.update(file_digest(path).encode())
+        h.update(b"\0")
+    h.update(json.dumps([str(v) for v in extra]).encode())
+    flush_digest_index()
+    return h.hexdigest()
+
+
+def load_catalog_index() -> Dict[str, list]:
+    """
+    Directory listings from the last case discovery: {dir: [mtime_ns, entries]}.
+    Empty when missing or unreadable.
+    """
+    try:
+        index = json.loads(CATALOG_INDEX.read_text())
+    except (OSError, ValueError):
+        return {}
+    return index if isinstance(index, dict) else {}
+
+
+def store_catalog_index(index: Dict[str, list]) -> None:
+    """Best-effort atomic write of the discovery listing index."""
+    _write_json(CATALOG_INDEX, index)
+
+
+def load_surfaces(key: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Load a surfaces dict previously stored under key, or None on a miss.
+    """
+    path = MESH_CACHE_DIR / f"{key}.npz"
+    if not path.is_file():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            names = json.loads(str(data["__names__"]))
+            surfaces: Dict[str, Dict[str, Any]] = {}
+            for i, name in enumerate(names):
+                surfaces[name] = {
+                    "vertices": data[f"v{i}"],
+                    "faces": data[f"f{i}"],
+                    "color": tuple(float(c) for c in data[f"c{i}"]),
+                    "display_name": str(data[f"n{i}"]),
+                }
+            return surfaces
+    except Exception:
+        return None
+
+
+def store_surfaces(key: str, surfaces: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Persist the vertices/faces/color/display_name of each surface as one .npz.
+    Best effort: failures leave the cache untouched.
+    """
+    arrays: Dict[str, Any] = {"__names__": np.array(json.dumps(list(surfaces)))}
+    for i, (name, surface) in enumerate(surfaces.items()):
+        arrays[f"v{i}"] = np.asarray(surface["vertices"], dtype=np.float32)
+        arrays[f"f{i}"] = np.asarray(surface["faces"], dtype=np.int32)
+        arrays[f"c{i}"] = np.asarray(surface.get("color", (1.0, 1.0, 1.0, 1.0)), dtype=np.float64)
+        arrays[f"n{i}"] = np.array(surface.get("display_name", name))
+    path = MESH_CACHE_DIR / f"{key}.npz"
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        MESH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Uncompressed: mesh floats barely deflate, and loads become plain reads
+        with tmp.open("wb") as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU bounded by entry count and/or by an approximate
+    byte budget computed with sizeof(value); either bound may be None. The most
+    recently inserted entry is always kept, even if it alone exceeds max_bytes.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 4,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> None:
+        self.max_entries = None if max_entries is None else max(1, int(max_entries))
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda _value: 0)
+        self._data: "OrderedDict[Hashable, tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            self._data.move_to_end(key)
+            return item[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = int(self._sizeof(value))
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while len(self._data) > 1 and (
+                (self.max_entries is not None and len(self._data) > self.max_entries)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+__all__ = [
+    "LRUCache",
+    "file_digest",
+    "fingerprint_inputs",
+    "flush_digest_index",
+    "load_catalog_index",
+    "load_surfaces",
+    "store_catalog_index",
+    "store_surfaces",
+]
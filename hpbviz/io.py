@@ -5,10 +5,17 @@ from typing import Tuple, Dict, Any, Optional, List, TextIO
 
 import sys
 
+import math
 import os
+from concurrent.futures import ThreadPoolExecutor
 import SimpleITK as sitk
 import numpy as np
 
+try:  # optional fast path; SimpleITK/GDCM remains the fallback reader
+    import pydicom
+except ImportError:  # pragma: no cover - depends on environment
+    pydicom = None
+
 _DICOM_INFO_TAGS = {
     "0008|103e": "SeriesDescription",
     "0008|1030": "StudyDescription",
@@ -23,10 +30,43 @@ _DICOM_INFO_TAGS = {
 }
 
 
+_DICOM_INFO_TAG_IDS = [int(tag.replace("|", ""), 16) for tag in _DICOM_INFO_TAGS]
+
+
+def _read_dicom_metadata_pydicom(file_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse only the _DICOM_INFO_TAGS elements (no pixel data, no other
+    attributes). Values are rendered like GDCM's strings, multi-values
+    joined with backslashes. None when pydicom is missing or cannot parse.
+    """
+    if pydicom is None:
+        return None
+    try:
+        ds = pydicom.dcmread(file_name, stop_before_pixels=True, specific_tags=_DICOM_INFO_TAG_IDS)
+    except Exception:
+        return None
+    info: Dict[str, Any] = {}
+    for tag_id, name in zip(_DICOM_INFO_TAG_IDS, _DICOM_INFO_TAGS.values()):
+        elem = ds.get(tag_id)
+        if elem is None:
+            continue
+        value = elem.value
+        if value is None:
+            info[name] = ""
+        elif elem.VM > 1:
+            info[name] = "\\".join(str(v) for v in value)
+        else:
+            info[name] = str(value)
+    return info
+
+
 def _read_dicom_metadata(file_name: str) -> Dict[str, Any]:
     """
     Read a small set of commonly useful DICOM tags from a file.
     """
+    fast = _read_dicom_metadata_pydicom(file_name)
+    if fast is not None:
+        return fast
     info: Dict[str, Any] = {}
     try:
         reader = sitk.ImageFileReader()
@@ -40,6 +80,78 @@ def _read_dicom_metadata(file_name: str) -> Dict[str, Any]:
     return info
 
 
+_DECODE_WORKERS = min(8, os.cpu_count() or 1)
+# The pydicom reader is meant for single files and small series; larger ones
+# go through GDCM, whose per-slice cost is amortized over the whole volume.
+_PYDICOM_MAX_SLICES = 256
+_INT16_MIN, _INT16_MAX = np.iinfo(np.int16).min, np.iinfo(np.int16).max
+
+
+def _rescale_params(ds: Any) -> Tuple[float, float]:
+    slope = float(getattr(ds, "RescaleSlope", 1.0) or 1.0)
+    intercept = float(getattr(ds, "RescaleIntercept", 0.0) or 0.0)
+    return slope, intercept
+
+
+def _read_dicom_pydicom(file_names: List[str]) -> Optional[sitk.Image]:
+    """
+    Decode single-frame DICOM slices with pydicom, in the given (GDCM-sorted)
+    order, into a 3D int16 image with rescale slope/intercept applied.
+    Returns None whenever the files are outside this simple case (too many
+    slices, mismatched geometry, non-integer rescale, or values that do not
+    fit int16) so the caller can fall back to SimpleITK, which picks a wider
+    pixel type for those.
+    """
+    if pydicom is None or not file_names or len(file_names) > _PYDICOM_MAX_SLICES:
+        return None
+    try:
+        def _decode(name: str) -> Tuple[Any, np.ndarray]:
+            # One full parse per file; the header checks below reuse it
+            ds = pydicom.dcmread(name)
+            if int(getattr(ds, "NumberOfFrames", 1) or 1) != 1:
+                raise ValueError("multi-frame")
+            return ds, ds.pixel_array
+
+        # pixel decoders release the GIL, so slices decode in parallel
+        with ThreadPoolExecutor(max_workers=_DECODE_WORKERS) as pool:
+            decoded = list(pool.map(_decode, file_names))
+
+        headers = [ds for ds, _ in decoded]
+        first = headers[0]
+        rows, cols = int(first.Rows), int(first.Columns)
+        if any(int(h.Rows) != rows or int(h.Columns) != cols for h in headers):
+            return None
+
+        volume = np.empty((len(decoded), rows, cols), dtype=np.int16)
+        for z, (ds, pixels) in enumerate(decoded):
+            slope, intercept = _rescale_params(ds)
+            if not (slope.is_integer() and intercept.is_integer()):
+                return None
+            values = pixels.astype(np.int32) * int(slope) + int(intercept)
+            if values.size and (values.min() < _INT16_MIN or values.max() > _INT16_MAX):
+                return None
+            volume[z] = values
+        image = sitk.GetImageFromArray(volume)
+
+        row_spacing, col_spacing = (float(v) for v in first.PixelSpacing)
+        cosines = np.array([float(v) for v in first.ImageOrientationPatient], dtype=np.float64)
+        row_dir, col_dir = cosines[:3], cosines[3:]
+        normal = np.cross(row_dir, col_dir)
+        first_pos = np.array([float(v) for v in first.ImagePositionPatient], dtype=np.float64)
+        last_pos = np.array([float(v) for v in headers[-1].ImagePositionPatient], dtype=np.float64)
+        if len(headers) > 1:
+            z_spacing = abs(float(np.dot(last_pos - first_pos, normal))) / (len(headers) - 1)
+        else:
+            z_spacing = float(getattr(first, "SliceThickness", 1.0) or 1.0)
+
+        image.SetSpacing((col_spacing, row_spacing, z_spacing or 1.0))
+        image.SetOrigin(tuple(first_pos))
+        image.SetDirection(tuple(np.column_stack([row_dir, col_dir, normal]).ravel()))
+        return image
+    except Exception:
+        return None
+
+
 # ----------------------------- Data Class ----------------------------- #
 
 @dataclass
@@ -165,12 +277,10 @@ class DicomSeries:
         add("Pixel type", pixel_type)
 
         if size:
-            voxel_count = 1
-            for v in size:
-                voxel_count *= int(v)
+            voxel_count = math.prod(int(v) for v in size)
             add("Voxel count", f"{voxel_count:,}")
             try:
-                spacing_product = float(np.prod(self.spacing))
+                spacing_product = math.prod(float(v) for v in self.spacing)
                 physical_volume = voxel_count * spacing_product
                 add("Volume (mm^3)", f"{physical_volume:,.2f}")
             except Exception:
@@ -178,7 +288,8 @@ class DicomSeries:
 
         return info
 
-    def print_summary(self, stream: TextIO = sys.stdout, prefix: str = "[dicom]") -> None:
+    def print_summary(self, stream: Optional[TextIO] = None, prefix: str = "[dicom]") -> None:
+        stream = stream or sys.stdout  # resolved per call so a redirected stdout is honoured
         items = self.summary_items()
         header_hint = (
             self.metadata.get("SeriesDescription")
@@ -222,14 +333,16 @@ class DicomSeries:
 
         if series_uid:
             chosen = series_uid
+            file_names = reader.GetGDCMSeriesFileNames(folder, chosen)
         else:
-            # Heuristic: pick the series with the most files
-            counts = {sid: len(reader.GetGDCMSeriesFileNames(folder, sid)) for sid in series_ids}
-            chosen = max(counts, key=counts.get)
-
-        file_names = reader.GetGDCMSeriesFileNames(folder, chosen)
-        reader.SetFileNames(file_names)
-        image = reader.Execute()
+            # Heuristic: pick the series with the most files (each series is enumerated once)
+            files_by_sid = {sid: reader.GetGDCMSeriesFileNames(folder, sid) for sid in series_ids}
+            chosen = max(files_by_sid, key=lambda sid: len(files_by_sid[sid]))
+            file_names = files_by_sid[chosen]
+        image = _read_dicom_pydicom(list(file_names))
+        if image is None:
+            reader.SetFileNames(file_names)
+            image = reader.Execute()
 
         spacing = image.GetSpacing()
         origin = image.GetOrigin()
@@ -251,7 +364,6 @@ class DicomSeries:
         """
         Returns (z, y, x) numpy array. Applies RescaleSlope/Intercept if available.
         """
-        arr = sitk.GetArrayFromImage(self.image).astype(np.float32)  # (slices, rows, cols)
         slope = 1.0
         intercept = 0.0
         try:
@@ -261,7 +373,13 @@ class DicomSeries:
                 intercept = float(self.image.GetMetaData("0028|1052"))
         except Exception:
             pass
-        return (arr * slope + intercept).astype(np.float32)
+        # One float32 copy straight from the ITK buffer, rescaled in place
+        arr = sitk.GetArrayViewFromImage(self.image).astype(np.float32)  # (slices, rows, cols)
+        if slope != 1.0:
+            np.multiply(arr, np.float32(slope), out=arr)
+        if intercept != 0.0:
+            np.add(arr, np.float32(intercept), out=arr)
+        return arr
 
 
 # ----------------------------- Helpers ----------------------------- #
@@ -271,6 +389,22 @@ def _is_nifti(path: str) -> bool:
     return p.endswith(".nii") or p.endswith(".nii.gz")
 
 
+_LIST_WORKERS = 8
+
+
+def _read_series_description(file_name: str) -> str:
+    """SeriesDescription (0008|103e) of one file, or "" when missing/unreadable."""
+    try:
+        fr = sitk.ImageFileReader()
+        fr.SetFileName(file_name)
+        fr.ReadImageInformation()
+        if fr.HasMetaDataKey("0008|103e"):
+            return fr.GetMetaData("0008|103e")
+    except Exception:
+        pass
+    return ""
+
+
 # ----------------------------- Public API ----------------------------- #
 
 def list_dicom_series(path: str) -> List[Dict[str, Any]]:
@@ -284,22 +418,17 @@ def list_dicom_series(path: str) -> List[Dict[str, Any]]:
 
     r = sitk.ImageSeriesReader()
     series_ids = r.GetGDCMSeriesIDs(path) or []
-    result: List[Dict[str, Any]] = []
-
-    for uid in series_ids:
-        files = r.GetGDCMSeriesFileNames(path, uid)
-        desc = ""
-        try:
-            fr = sitk.ImageFileReader()
-            fr.SetFileName(files[0])
-            fr.ReadImageInformation()
-            if fr.HasMetaDataKey("0008|103e"):
-                desc = fr.GetMetaData("0008|103e")
-        except Exception:
-            pass
-        result.append({"uid": uid, "count": len(files), "description": desc})
+    files_by_uid = {uid: r.GetGDCMSeriesFileNames(path, uid) for uid in series_ids}
+    if not files_by_uid:
+        return []
 
-    return result
+    # Header reads are latency-bound (network shares especially), so overlap them
+    with ThreadPoolExecutor(max_workers=min(_LIST_WORKERS, len(files_by_uid))) as pool:
+        descs = pool.map(_read_series_description, (files[0] for files in files_by_uid.values()))
+        return [
+            {"uid": uid, "count": len(files), "description": desc}
+            for (uid, files), desc in zip(files_by_uid.items(), descs)
+        ]
 
 
 def load_dicom_series(path: str, series_uid: Optional[str] = None) -> sitk.Image:
@@ -333,7 +462,9 @@ def load_dicom_series(path: str, series_uid: Optional[str] = None) -> sitk.Image
         return sitk.Cast(img, sitk.sitkInt16)
 
     # Single-file DICOM (or other readable format)
-    img = sitk.ReadImage(path)  # will raise if unreadable
+    img = _read_dicom_pydicom([path])
+    if img is None:
+        img = sitk.ReadImage(path)  # will raise if unreadable
     metadata = {
         "SourcePath": os.path.abspath(path),
         "SourceType": "Image file",
@@ -349,19 +480,23 @@ def load_dicom_series(path: str, series_uid: Optional[str] = None) -> sitk.Image
     return sitk.Cast(img, sitk.sitkInt16)
 
 
+_OBJ_CHUNK_ROWS = 1 << 16
+
+
 def save_mesh(surface: Dict[str, Any], path: str) -> None:
     """
     Write a triangle mesh dict to Wavefront OBJ.
     surface = {"vertices": (N,3) array-like, "faces": (M,3) int array-like}
+    Vertices are written with 6 decimals (micrometre precision in mm space).
     """
-    V = surface["vertices"]
-    F = surface["faces"]
+    V = np.asarray(surface["vertices"], dtype=np.float64).reshape(-1, 3)
+    F = np.asarray(surface["faces"], dtype=np.int64).reshape(-1, 3) + 1  # OBJ uses 1-based indexing
     with open(path, "w") as f:
-        for v in V:
-            f.write(f"v {float(v[0])} {float(v[1])} {float(v[2])}\n")
-        for tri in F:
-            # OBJ uses 1-based indexing
-            f.write(f"f {int(tri[0]) + 1} {int(tri[1]) + 1} {int(tri[2]) + 1}\n")
+        # One %-format call per block of rows instead of one f-string per line
+        for rows, line in ((V, "v %.6f %.6f %.6f\n"), (F, "f %d %d %d\n")):
+            for start in range(0, len(rows), _OBJ_CHUNK_ROWS):
+                block = rows[start : start + _OBJ_CHUNK_ROWS]
+                f.write((line * len(block)) % tuple(block.ravel().tolist()))
 
 
 __all__ = [
@@ -1,10 +1,61 @@
 
 from __future__ import annotations
-from typing import Tuple, Dict, Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Dict, Any, Iterable
 import numpy as np
 import vtk
 from vtk.util import numpy_support
 
+def _occupied_slices(mask_bool: np.ndarray, pad: int = 1):
+    """
+    Tight (z, y, x) slices around the nonzero voxels, padded by `pad` voxels
+    (clamped to the volume) so boundary cells keep their zero neighbours.
+    Works on bool or integer label arrays. Returns None for an empty mask.
+    """
+    zs = np.flatnonzero(mask_bool.any(axis=(1, 2)))
+    if zs.size == 0:
+        return None
+    # y/x extents only need to look at the occupied z slab
+    slab = mask_bool[zs[0] : zs[-1] + 1]
+    ys = np.flatnonzero(slab.any(axis=(0, 2)))
+    xs = np.flatnonzero(slab.any(axis=(0, 1)))
+    return tuple(
+        slice(max(int(idx[0]) - pad, 0), min(int(idx[-1]) + 1 + pad, dim))
+        for idx, dim in zip((zs, ys, xs), mask_bool.shape)
+    )
+
+
+# PyPI VTK wheels start on the sequential SMP backend, which leaves flying
+# edges single-threaded; switch to std::thread unless a backend was chosen
+# explicitly through VTK's own environment variable.
+if "VTK_SMP_BACKEND_IN_USE" not in os.environ and hasattr(vtk, "vtkSMPTools"):
+    vtk.vtkSMPTools.SetBackend("STDThread")
+
+
+# Both are discrete (label-boundary) extractors and yield the same vertices and
+# triangles; flying edges is several times faster, marching cubes is the reference.
+_SURFACE_FILTERS = {
+    "flying_edges": vtk.vtkDiscreteFlyingEdges3D,
+    "marching_cubes": vtk.vtkDiscreteMarchingCubes,
+}
+
+
+def _shift_origin(origin, box, spacing) -> Tuple[float, float, float]:
+    """Physical (x, y, z) origin of the (z, y, x) sub-block `box`."""
+    origin = tuple(origin) if origin is not None else (0.0, 0.0, 0.0)
+    z0, y0, x0 = (s.start for s in box)
+    return (
+        origin[0] + x0 * spacing[0],
+        origin[1] + y0 * spacing[1],
+        origin[2] + z0 * spacing[2],
+    )
+
+
+class EmptyMaskError(ValueError):
+    """Raised when a mask has no foreground voxels to mesh, or meshes to nothing."""
+
+
 class MeshBuilder:
     def __init__(self):
         pass
@@ -15,53 +66,154 @@ class MeshBuilder:
         spacing: Tuple[float, float, float],
         origin: Tuple[float, float, float] | None = None,
         label: int = 1,
+        sparse: bool = False,
+        method: str = "flying_edges",
     ) -> Dict[str, Any]:
         """
         mask_zyx: binary or label mask (z, y, x)
         spacing: image spacing (x_spacing, y_spacing, z_spacing).
         origin: physical origin (x, y, z). Defaults to (0, 0, 0).
         label: label value to extract (used if mask is multi-label).
+        sparse: run marching cubes only on the occupied sub-block (bounding box
+            of the mask plus a one-voxel margin) instead of the full volume.
+            Produces the same surface; empty space is never visited.
+        method: "flying_edges" (default) or "marching_cubes".
         Returns dict: { 'vertices': (N, 3), 'faces': (M, 3) }
         """
         if mask_zyx.ndim != 3:
             raise ValueError("Mask must be a 3D array (z, y, x).")
 
-        mask_bool = (mask_zyx == label) if label is not None else mask_zyx > 0
-        if not np.any(mask_bool):
-            raise ValueError("Mask is empty; nothing to mesh.")
+        if sparse and label is None and mask_zyx.dtype != np.bool_:
+            # Locate the foreground on the raw labels so that only the occupied
+            # block is ever thresholded (no full-volume bool allocation).
+            box = _occupied_slices(mask_zyx)
+            if box is None:
+                raise EmptyMaskError("Mask is empty; nothing to mesh.")
+            return self.mask_to_surface_bool(
+                mask_zyx[box] > 0,
+                spacing,
+                origin=_shift_origin(origin, box, spacing),
+                method=method,
+            )
+
+        if label is not None:
+            mask_bool = mask_zyx == label
+        elif mask_zyx.dtype == np.bool_:
+            mask_bool = mask_zyx  # already binary: no thresholding copy
+        else:
+            mask_bool = mask_zyx > 0
+        return self.mask_to_surface_bool(mask_bool, spacing, origin=origin, sparse=sparse, method=method)
+
+    def mask_to_surface_bool(
+        self,
+        mask_bool: np.ndarray,
+        spacing: Tuple[float, float, float],
+        origin: Tuple[float, float, float] | None = None,
+        sparse: bool = False,
+        method: str = "flying_edges",
+    ) -> Dict[str, Any]:
+        """
+        Same as mask_to_surface for a precomputed boolean mask (z, y, x), so
+        callers that already thresholded the volume do not pay for it again.
+        """
+        if mask_bool.ndim != 3:
+            raise ValueError("Mask must be a 3D array (z, y, x).")
+        if mask_bool.dtype != np.bool_:
+            raise TypeError("mask_bool must have dtype bool.")
+        try:
+            surface_filter = _SURFACE_FILTERS[method]()
+        except KeyError:
+            raise ValueError(f"Unknown surface method {method!r}; expected one of {sorted(_SURFACE_FILTERS)}") from None
+
+        origin = tuple(origin) if origin is not None else (0.0, 0.0, 0.0)
+        if sparse:
+            box = _occupied_slices(mask_bool)
+            if box is None:
+                raise EmptyMaskError("Mask is empty; nothing to mesh.")
+            mask_bool = mask_bool[box]
+            origin = _shift_origin(origin, box, spacing)
+        elif not np.any(mask_bool):
+            raise EmptyMaskError("Mask is empty; nothing to mesh.")
 
         nz, ny, nx = mask_bool.shape
+        # bool -> uint8 is a reinterpreting view; the only copy made is the
+        # contiguous one of a cropped block, and VTK borrows that buffer.
+        mask_u8 = np.ascontiguousarray(mask_bool.view(np.uint8))
         vtk_arr = numpy_support.numpy_to_vtk(
-            mask_bool.astype(np.uint8).ravel(order="C"),
-            deep=True,
+            mask_u8.ravel(),
+            deep=False,
             array_type=vtk.VTK_UNSIGNED_CHAR,
         )
 
         image = vtk.vtkImageData()
         image.SetDimensions(nx, ny, nz)
         image.SetSpacing(spacing)
-        image.SetOrigin(origin if origin is not None else (0.0, 0.0, 0.0))
+        image.SetOrigin(origin)
         image.SetExtent(0, nx - 1, 0, ny - 1, 0, nz - 1)
         image.GetPointData().SetScalars(vtk_arr)
         image.Modified()
 
-        dmc = vtk.vtkDiscreteMarchingCubes()
-        dmc.SetInputData(image)
-        dmc.SetValue(0, 1)
-        dmc.Update()
+        surface_filter.SetInputData(image)
+        surface_filter.SetValue(0, 1)
+        # Only vertices and triangles are consumed
+        surface_filter.ComputeNormalsOff()
+        surface_filter.ComputeGradientsOff()
+        surface_filter.ComputeScalarsOff()
+        surface_filter.Update()
 
-        poly = dmc.GetOutput()
+        poly = surface_filter.GetOutput()
         if poly is None or poly.GetNumberOfPoints() == 0:
-            raise ValueError("Marching cubes returned an empty mesh.")
+            raise EmptyMaskError("Marching cubes returned an empty mesh.")
 
         vertices = numpy_support.vtk_to_numpy(poly.GetPoints().GetData())
 
         polys = poly.GetPolys()
         if polys is None or polys.GetNumberOfCells() == 0:
-            raise ValueError("Marching cubes returned a mesh without faces.")
+            raise EmptyMaskError("Marching cubes returned a mesh without faces.")
         faces = numpy_support.vtk_to_numpy(polys.GetData()).reshape(-1, 4)[:, 1:]
 
         return {
             "vertices": vertices.astype(np.float32, copy=False),
             "faces": faces.astype(np.int32, copy=False),
         }
+
+    def masks_to_surfaces(
+        self,
+        volume_zyx: np.ndarray,
+        labels: Iterable[int],
+        spacing: Tuple[float, float, float],
+        origin: Tuple[float, float, float] | None = None,
+        method: str = "flying_edges",
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Extract one surface per label from a multi-label volume (z, y, x).
+        The nonzero region is located in a single pass; every label is then
+        thresholded and meshed inside that sub-block only, instead of scanning
+        the whole volume once per label.
+        Returns {label: {'vertices', 'faces'}}; labels that yield no surface are omitted.
+        """
+        if volume_zyx.ndim != 3:
+            raise ValueError("Mask must be a 3D array (z, y, x).")
+        box = _occupied_slices(volume_zyx)
+        if box is None:
+            return {}
+        sub_origin = _shift_origin(origin, box, spacing)
+        sub = volume_zyx[box]
+        labels = [int(label) for label in labels]
+
+        def _one(label: int):
+            try:
+                return self.mask_to_surface_bool(
+                    sub == label, spacing=spacing, origin=sub_origin, sparse=True, method=method
+                )
+            except EmptyMaskError:
+                return None
+
+        # VTK releases the GIL inside marching cubes, so labels mesh in parallel
+        workers = min(len(labels), os.cpu_count() or 1)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                meshes = list(pool.map(_one, labels))
+        else:
+            meshes = [_one(label) for label in labels]
+        return {label: mesh for label, mesh in zip(labels, meshes) if mesh is not None}
@@ -52,9 +52,14 @@ def prepare_case(
     channel0_path = case_dir / f"{case_id}_0000.nii.gz"
     meta_path = case_dir / "meta.json"
 
-    # Write images (preserve original type)
-    sitk.WriteImage(image, str(raw_path))
-    sitk.WriteImage(image, str(channel0_path))
+    # Write the image once (preserve original type; fastest gzip level); the
+    # nnU-Net channel file holds the same bytes, so it is a hardlink when possible.
+    sitk.WriteImage(image, str(raw_path), useCompression=True, compressionLevel=1)
+    channel0_path.unlink(missing_ok=True)
+    try:
+        os.link(raw_path, channel0_path)
+    except OSError:
+        shutil.copy2(raw_path, channel0_path)
 
     meta = {
         "case_id": case_id,
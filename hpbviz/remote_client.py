@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import argparse
+import io
 import json
 import os
 import shutil
 import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, Iterable, Optional, TextIO, Union
 
 import SimpleITK as sitk
 
@@ -15,8 +19,24 @@ try:
 except ImportError as exc:  # pragma: no cover
     raise SystemExit("The 'requests' package is required. Install with 'pip install requests'.") from exc
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from .remote import prepare_case
 
+# One pooled session for every upload: the liver and Task008 posts of a case,
+# and concurrent cases, reuse keep-alive connections instead of reconnecting.
+# Only connection failures are retried; the streamed request body cannot be
+# replayed once the server has started reading it.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, connect=3, read=0, status=0, other=0, backoff_factor=0.5),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
 
 def _strip_case_name(name: str) -> str:
     if name.endswith(".nii.gz"):
@@ -31,17 +51,102 @@ def _is_mask_filename(name: str) -> bool:
     return any(token in lowered for token in ("mask", "label", "seg", "manual"))
 
 
+class _MultipartFileBody:
+    """
+    Streamed multipart/form-data body holding a single file field.
+    requests' files= assembles the whole body in memory first; this reads the
+    file in blocks between a small header and trailer, with a known length.
+    """
+
+    def __init__(self, field: str, file_path: Path, content_type: str) -> None:
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        filename = file_path.name.replace('"', "%22")
+        head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+        self._fh = file_path.open("rb")
+        self._parts = [io.BytesIO(head), self._fh, io.BytesIO(tail)]
+        self._length = len(head) + os.fstat(self._fh.fileno()).st_size + len(tail)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(part.read() for part in self._parts)
+        chunks = []
+        while size > 0 and self._parts:
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def close(self) -> None:
+        self._fh.close()
+
+
 def _post_file(url: str, file_path: Path, *, params: Optional[dict[str, str]] = None, timeout: int = 900) -> bytes:
-    with file_path.open("rb") as fh:
-        files = {"ct": (file_path.name, fh, "application/gzip")}
-        response = requests.post(url, files=files, params=params or {}, timeout=timeout)
+    body = _MultipartFileBody("ct", file_path, "application/gzip")
+    try:
+        response = _SESSION.post(
+            url,
+            data=body,
+            headers={"Content-Type": body.content_type},
+            params=params or {},
+            timeout=timeout,
+        )
+    finally:
+        body.close()
     if response.status_code != 200:
         detail = response.text.strip()
         raise RuntimeError(f"Request failed ({response.status_code}): {detail or 'no details'}")
     return response.content
 
 
-def _write_meta(image: sitk.Image, case_dir: Path, case_id: str, source_path: Path) -> Path:
+def _is_current_copy(src: Path, dst: Path) -> bool:
+    """
+    True when dst already holds src's bytes: the same file (or a hardlink of
+    it), or an earlier copy2 of it with matching size and mtime.
+    """
+    try:
+        if os.path.samefile(src, dst):
+            return True
+        a, b = src.stat(), dst.stat()
+    except OSError:
+        return False
+    return a.st_size == b.st_size and a.st_mtime_ns == b.st_mtime_ns
+
+
+def _copy_if_changed(src: Path, dst: Path) -> None:
+    if not _is_current_copy(src, dst):
+        shutil.copy2(src, dst)
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Hardlink dst to src (same bytes, no second write); copy across devices."""
+    if _is_current_copy(src, dst):
+        return
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _write_meta(
+    image: Union[sitk.Image, sitk.ImageFileReader],
+    case_dir: Path,
+    case_id: str,
+    source_path: Path,
+) -> Path:
+    """image may be a loaded image or a reader that has only read the header."""
     meta = {
         "case_id": case_id,
         "source": str(source_path.resolve()),
@@ -65,22 +170,24 @@ def _stage_nifti_case(
     case_dir.mkdir(parents=True, exist_ok=True)
 
     suffix = ".nii.gz" if ct_src.name.endswith(".nii.gz") else ".nii"
+    # Reruns skip files that are already staged; the nnU-Net channel file is
+    # the same bytes as the CT, so it is a hardlink rather than a second copy.
     ct_dest = case_dir / f"{case_id}{suffix}"
-    if not ct_dest.exists() or ct_dest.resolve() != ct_src.resolve():
-        shutil.copy2(ct_src, ct_dest)
+    _copy_if_changed(ct_src, ct_dest)
 
     nnunet_dest = case_dir / f"{case_id}_0000{suffix}"
-    if not nnunet_dest.exists():
-        shutil.copy2(ct_dest, nnunet_dest)
+    _link_or_copy(ct_dest, nnunet_dest)
 
-    image = sitk.ReadImage(str(ct_dest))
-    meta_path = _write_meta(image, case_dir, case_id, ct_src)
+    # meta.json only needs the geometry, so read the header, not the voxels
+    header = sitk.ImageFileReader()
+    header.SetFileName(str(ct_dest))
+    header.ReadImageInformation()
+    meta_path = _write_meta(header, case_dir, case_id, ct_src)
 
     manual_dest = None
     if manual_src and manual_src.exists():
         manual_dest = case_dir / manual_src.name
-        if not manual_dest.exists() or manual_dest.resolve() != manual_src.resolve():
-            shutil.copy2(manual_src, manual_dest)
+        _copy_if_changed(manual_src, manual_dest)
 
     return {
         "case_dir": case_dir,
@@ -182,8 +289,7 @@ def process_case(
             manual_src = _maybe_find_manual_mask(prep["case_id"], raw_entry, mask_root)
             if manual_src:
                 manual_case_path = stage_info["case_dir"] / manual_src.name
-                if not manual_case_path.exists() or manual_case_path.resolve() != manual_src.resolve():
-                    shutil.copy2(manual_src, manual_case_path)
+                _copy_if_changed(manual_src, manual_case_path)
             case_id = prep["case_id"]
             stage_info["manual_path"] = manual_case_path
     else:
@@ -217,8 +323,7 @@ def process_case(
     provided_path = None
     if manual_case_path and manual_case_path.exists():
         provided_path = output_case_dir / f"{case_id}_input_mask{manual_case_path.suffix}"
-        if not provided_path.exists() or provided_path.resolve() != manual_case_path.resolve():
-            shutil.copy2(manual_case_path, provided_path)
+        _copy_if_changed(manual_case_path, provided_path)
 
     return {
         "case": case_id,
@@ -239,6 +344,58 @@ def iterate_cases(raw_root: Path, include: Optional[Iterable[str]] = None) -> li
     return sorted(cases)
 
 
+_case_context = threading.local()
+
+
+class _CaseTaggedStream:
+    """
+    stdout/stderr proxy that prefixes every line written from a case worker
+    with "[<case>] ", so output from concurrent cases stays attributable.
+    Every thread's output is buffered until its newline arrives and written
+    as whole lines under one lock, so lines from different threads (tagged
+    worker output or the main thread's summaries) never interleave mid-line.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+        self._lock = threading.Lock()
+        self._pending = threading.local()
+
+    def _tag(self) -> str:
+        case = getattr(_case_context, "name", None)
+        return f"[{case}] " if case is not None else ""
+
+    def write(self, text: str) -> int:
+        *lines, rest = (getattr(self._pending, "text", "") + text).split("\n")
+        self._pending.text = rest
+        if lines:
+            tag = self._tag()
+            with self._lock:
+                self._stream.write("".join(f"{tag}{line}\n" for line in lines))
+        return len(text)
+
+    def flush(self) -> None:
+        rest = getattr(self._pending, "text", "")
+        self._pending.text = ""
+        with self._lock:
+            if rest:
+                self._stream.write(f"{self._tag()}{rest}")
+            self._stream.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+def _process_case_tagged(case_name: str, **kwargs: Any) -> dict[str, str]:
+    _case_context.name = case_name
+    try:
+        return process_case(case_name, **kwargs)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        _case_context.name = None
+
+
 def run_cli(argv: Optional[list[str]] = None) -> None:
     parser = argparse.ArgumentParser(description="Prepare and upload cases to the remote AWS segmenter.")
     parser.add_argument("cases", nargs="*", help="Specific case directories/files under raw root. If omitted, process all.")
@@ -253,6 +410,13 @@ def run_cli(argv: Optional[list[str]] = None) -> None:
     )
     parser.add_argument("--no-task008", action="store_true", help="Skip nnU-Net Task008 upload.")
     parser.add_argument("--fast", action="store_true", help="Pass ?fast=true to the server for quicker inference.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of cases staged and uploaded at the same time (default: 1). "
+        "Raise only if the server has the GPU capacity for parallel segmentations.",
+    )
     args = parser.parse_args(argv)
 
     raw_root = Path(args.raw_root).expanduser().resolve()
@@ -268,24 +432,45 @@ def run_cli(argv: Optional[list[str]] = None) -> None:
         print("No cases found.")
         return
 
-    summaries = []
-    for case_name in case_names:
-        try:
-            info = process_case(
-                case_name,
-                raw_root=raw_root,
-                input_root=input_root,
-                output_root=output_root,
-                server=args.server,
-                include_task008=not args.no_task008,
-                fast=args.fast,
-                mask_root=mask_root,
-            )
-            summaries.append(info)
-            print(json.dumps(info, indent=2), flush=True)
-        except Exception as exc:  # pragma: no cover - top-level reporting
-            print(f"[error] {case_name}: {exc}", file=sys.stderr, flush=True)
-
+    # Each case is dominated by the upload and the server-side inference, so
+    # --concurrency of them may run at once; summaries still follow the
+    # requested case order and worker output is tagged with its case.
+    results: dict[str, dict[str, str]] = {}
+    workers = max(1, min(args.concurrency, len(case_names)))
+    stdout, stderr = sys.stdout, sys.stderr
+    if workers > 1:
+        sys.stdout, sys.stderr = _CaseTaggedStream(stdout), _CaseTaggedStream(stderr)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hpbviz-case") as pool:
+            futures = {
+                pool.submit(
+                    _process_case_tagged,
+                    case_name,
+                    raw_root=raw_root,
+                    input_root=input_root,
+                    output_root=output_root,
+                    server=args.server,
+                    include_task008=not args.no_task008,
+                    fast=args.fast,
+                    mask_root=mask_root,
+                ): case_name
+                for case_name in case_names
+            }
+            for future in as_completed(futures):
+                case_name = futures[future]
+                try:
+                    info = future.result()
+                except Exception as exc:  # pragma: no cover - top-level reporting
+                    print(f"[error] {case_name}: {exc}", file=sys.stderr, flush=True)
+                    continue
+                results[case_name] = info
+                print(json.dumps(info, indent=2), flush=True)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        sys.stdout, sys.stderr = stdout, stderr
+
+    summaries = [results[name] for name in case_names if name in results]
     if summaries:
         print("\nProcessed cases:")
         for info in summaries:
@@ -23,6 +23,7 @@ from .ui import SidebarMixin, ViewerActionsMixin, ThemeMixin
 
 
 CaseLoader = Callable[[str], Tuple[sitk.Image, Dict[str, Dict[str, np.ndarray]], Any]]
+CasePrefetcher = Callable[[str], None]
 
 
 class HpbViewer(SidebarMixin, ViewerActionsMixin, ThemeMixin):
@@ -34,6 +35,7 @@ class HpbViewer(SidebarMixin, ViewerActionsMixin, ThemeMixin):
         case_catalog: Optional[Dict[str, Dict[str, str]]] = None,
         case_loader: Optional[CaseLoader] = None,
         current_case: Optional[str] = None,
+        case_prefetcher: Optional[CasePrefetcher] = None,
     ) -> None:
         self.image_sitk = image
         self.volume_name = volume_name
@@ -51,6 +53,7 @@ class HpbViewer(SidebarMixin, ViewerActionsMixin, ThemeMixin):
         self.case_catalog = case_catalog or {}
         self.case_loader = case_loader
         self.current_case = current_case
+        self.case_prefetcher = case_prefetcher
 
         sx, sy, sz = image.GetSpacing()
         self.spacing_xyz = (float(sx), float(sy), float(sz))
@@ -110,7 +113,7 @@ class HpbViewer(SidebarMixin, ViewerActionsMixin, ThemeMixin):
             return
 
         if self._volume_data is None:
-            self._volume_data = sitk.GetArrayFromImage(self.image_sitk).astype(np.float32)
+            self._volume_data = self._volume_array(self.image_sitk)
         vol = self._volume_data
         finite = vol[np.isfinite(vol)]
         if finite.size == 0:
@@ -137,6 +140,11 @@ class HpbViewer(SidebarMixin, ViewerActionsMixin, ThemeMixin):
         )
         self._apply_window_customizations()
 
+    @staticmethod
+    def _volume_array(image: sitk.Image) -> np.ndarray:
+        # Single float32 copy straight from the ITK buffer (no intermediate int16 copy)
+        return np.array(sitk.GetArrayViewFromImage(image), dtype=np.float32)
+
     def _setup_side_panel(self) -> None:
         if self.viewer is None:
             return
@@ -266,7 +274,7 @@ class HpbViewer(SidebarMixin, ViewerActionsMixin, ThemeMixin):
 
         self.current_case = case_name
         self.image_sitk = img
-        self._volume_data = sitk.GetArrayFromImage(img).astype(np.float32)
+        self._volume_data = self._volume_array(img)
         sx, sy, sz = img.GetSpacing()
         self.spacing_xyz = (float(sx), float(sy), float(sz))
         self.spacing_zyx = (float(sz), float(sy), float(sx))
@@ -280,6 +288,9 @@ class HpbViewer(SidebarMixin, ViewerActionsMixin, ThemeMixin):
 
         self._add_surfaces(surfaces, clear_existing=True)
 
+        if self.case_prefetcher is not None:
+            self.case_prefetcher(case_name)
+
         self._suppress_case_signal = True
         try:
             self._setup_side_panel()
@@ -294,13 +305,15 @@ class HpbViewer(SidebarMixin, ViewerActionsMixin, ThemeMixin):
         body = sitk.BinaryMorphologicalClosing(body, [2, 2, 2])
         body = sitk.VotingBinaryHoleFilling(body, radius=[1, 1, 1], majorityThreshold=1)
 
-        arr = (sitk.GetArrayFromImage(body) > 0).astype(np.uint8)
-        if arr.max() == 0:
+        view = sitk.GetArrayViewFromImage(body)
+        arr = np.empty(view.shape, dtype=np.bool_)
+        np.not_equal(view, 0, out=arr)
+        if not arr.any():
             return None
 
         sx, sy, sz = self.spacing_xyz
         origin = tuple(float(v) for v in self.image_sitk.GetOrigin())
-        return self._mesher.mask_to_surface(arr, spacing=(sx, sy, sz), origin=origin)
+        return self._mesher.mask_to_surface(arr, spacing=(sx, sy, sz), origin=origin, label=None, sparse=True)
 
     def _apply_window_customizations(self) -> None:
         if not self.viewer: